@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AttendanceApiConfig(AppConfig):
     name = 'attendance_api'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .ingest import ingest_scan_events
+
+logger = logging.getLogger(__name__)
+
+ASYNC_INGEST_BATCH_SIZE = getattr(settings, 'ASYNC_INGEST_BATCH_SIZE', 2000)
+ASYNC_INGEST_FLUSH_INTERVAL = getattr(settings, 'ASYNC_INGEST_FLUSH_INTERVAL', 0.5)
+ASYNC_INGEST_MAX_PENDING = getattr(settings, 'ASYNC_INGEST_MAX_PENDING', 100000)
+
+
+class AsyncScanWriter:
+    """Buffers scan events on an asyncio.Queue and writes them in batches.
+
+    Requests only enqueue, so the ack does not wait on the database; one
+    background task drains the queue and calls ingest_scan_events() (in the
+    sync thread) whenever ``batch_size`` events are waiting or
+    ``flush_interval`` seconds have passed since the first of them arrived.
+    If a merged batch fails, each submission in it is retried on its own, so
+    one reader's bad payload or a constraint error only costs that reader's
+    events. The task is started on first use in the server's event loop. Queued
+    events live only in memory: readers that need delivery guarantees should
+    send sequences so a later replay fills any gap.
+    """
+
+    def __init__(self, batch_size=ASYNC_INGEST_BATCH_SIZE, flush_interval=ASYNC_INGEST_FLUSH_INTERVAL,
+                 max_pending=ASYNC_INGEST_MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue = None
+        self._task = None
+        self.pending = 0
+        self.written = 0
+        self.rejected = 0
+        self.failed = 0
+        self.batches = 0
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self.pending = 0
+            self._task = loop.create_task(self._run())
+
+    def submit(self, events):
+        """Queue ``events``; returns False (nothing queued) when the buffer is full."""
+        self._ensure_running()
+        if self.pending + len(events) > self.max_pending:
+            return False
+        self.pending += len(events)
+        self._queue.put_nowait(events)
+        return True
+
+    async def _collect(self):
+        """Wait for submissions and return them as a list, stopping at batch_size events or the flush interval."""
+        submissions = [await self._queue.get()]
+        size = len(submissions[0])
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while size < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                events = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            submissions.append(events)
+            size += len(events)
+        return submissions
+
+    async def _write(self, events):
+        result = await sync_to_async(ingest_scan_events)(events)
+        self.written += result.accepted
+        self.rejected += result.rejected
+        self.batches += 1
+
+    async def _write_batch(self, submissions):
+        batch = [event for events in submissions for event in events]
+        try:
+            await self._write(batch)
+            return
+        except Exception:
+            if len(submissions) == 1:
+                self.failed += len(batch)
+                logger.exception('Async scan batch of %d events failed', len(batch))
+                return
+            logger.warning('Async scan batch of %d events failed, retrying its %d submissions one by one',
+                           len(batch), len(submissions), exc_info=True)
+
+        for events in submissions:
+            try:
+                await self._write(events)
+            except Exception:
+                self.failed += len(events)
+                logger.exception('Async scan submission of %d events failed', len(events))
+
+    async def _run(self):
+        while True:
+            submissions = await self._collect()
+            try:
+                await self._write_batch(submissions)
+            finally:
+                self.pending -= sum(len(events) for events in submissions)
+
+    def stats(self):
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'pending': self.pending,
+            'written': self.written,
+            'rejected': self.rejected,
+            'failed': self.failed,
+            'batches': self.batches,
+            'batch_size': self.batch_size,
+            'flush_interval_seconds': self.flush_interval,
+        }
+
+
+scan_writer = AsyncScanWriter()
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from .hashers import TunableArgon2PasswordHasher, TunablePBKDF2PasswordHasher, TunableScryptPasswordHasher
+
+# Cache backends that keep their data inside one worker process
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+# (hasher, cost attribute, setting) for every cost a setting can change
+HASHER_COSTS = [
+    (TunablePBKDF2PasswordHasher, 'iterations', 'PASSWORD_PBKDF2_ITERATIONS'),
+    (TunableScryptPasswordHasher, 'work_factor', 'PASSWORD_SCRYPT_WORK_FACTOR'),
+    (TunableArgon2PasswordHasher, 'time_cost', 'PASSWORD_ARGON2_TIME_COST'),
+    (TunableArgon2PasswordHasher, 'memory_cost', 'PASSWORD_ARGON2_MEMORY_COST'),
+]
+
+CACHE_BACKED_SESSION_ENGINES = {
+    'attendance_api.sessions.cached_db',
+    'attendance_api.sessions.cache',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.cache',
+}
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+    """Refuse cache-backed sessions on a per-process cache.
+
+    A logout or flush() would only evict the session from the worker that
+    served it; every other worker keeps accepting the cookie until its own
+    cache entry expires.
+    """
+    if settings.SESSION_ENGINE not in CACHE_BACKED_SESSION_ENGINES:
+        return []
+    alias = getattr(settings, 'SESSION_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'{settings.SESSION_ENGINE} needs a cache shared by all workers, but the '
+        f'{alias!r} cache is {backend}.',
+        hint="Use SESSION_STORE=db, or set CACHE_BACKEND=redis (or 'file' on a single host).",
+        id='attendance_api.E001',
+    )]
+
+
+@register(Tags.security)
+def check_password_hash_costs(app_configs, **kwargs):
+    """Warn while a password hashing cost is set below Django's default."""
+    warnings = []
+    for hasher, attribute, setting in HASHER_COSTS:
+        configured = getattr(hasher, attribute)
+        default = getattr(hasher.__bases__[0], attribute)
+        if configured < default:
+            warnings.append(Warning(
+                f'{setting}={configured} is below Django\'s default of {default}; every user '
+                f'is rehashed at the lower cost on their next login.',
+                hint=f'Unset {setting} unless login throughput really needs it.',
+                id='attendance_api.W001',
+            ))
+    return warnings
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from django.conf import settings
+
+from .index_generation import IndexGeneration
+from .models import Credential
+
+# Changes made by other workers arrive through the shared generation (see
+# index_generation.py); the periodic full reload only catches writes that
+# bypass the signals, such as QuerySet.update() or raw SQL.
+CREDENTIAL_INDEX_TTL = getattr(settings, 'CREDENTIAL_INDEX_TTL', 300)
+
+
+class CredentialIndex:
+    """Process-local map of credential UID -> (student_id, teacher_id).
+
+    Loaded lazily on the first lookup, so resolving a swipe is a single dict
+    hit. Credential writes call changed() (from the save/delete signals):
+    once the transaction commits, this process drops its copy and every
+    other worker sees the shared generation move within its check interval.
+    """
+
+    def __init__(self, ttl=CREDENTIAL_INDEX_TTL):
+        self.ttl = ttl
+        self.generation = IndexGeneration('credential_index')
+        self._lock = threading.Lock()
+        self._by_uid = None
+        self._loaded_at = 0.0
+
+    def _load(self):
+        # Read before the rows, so a change committed mid-load triggers another reload
+        generation = self.generation.current()
+        rows = Credential.objects.values_list('uid', 'student_id', 'teacher_id')
+        self._by_uid = {
+            uid: (student_id, teacher_id)
+            for uid, student_id, teacher_id in rows.iterator(chunk_size=5000)
+        }
+        self._loaded_at = time.monotonic()
+        self.generation.loaded(generation)
+
+    def _expired(self):
+        return self._by_uid is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def _ensure_loaded(self):
+        if self._expired() or self.generation.changed():
+            with self._lock:
+                if self._expired() or self.generation.changed(force=True):
+                    self._load()
+        return self._by_uid
+
+    def resolve(self, uid):
+        """Return (student_id, teacher_id) for ``uid`` or None if it is unknown."""
+        return self._ensure_loaded().get(uid)
+
+    def changed(self):
+        self.generation.bump(then=self.invalidate)
+
+    def invalidate(self):
+        with self._lock:
+            self._by_uid = None
+
+
+credential_index = CredentialIndex()
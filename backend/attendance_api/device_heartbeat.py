@@ -0,0 +1,155 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Q, Value, When
+from django.utils import timezone
+
+from .models import Device
+from .stats_cache import stats_cache
+from .live_events import broadcaster
+
+HEARTBEAT_FLUSH_INTERVAL = getattr(settings, 'DEVICE_HEARTBEAT_FLUSH_INTERVAL', 10)
+DEVICE_OFFLINE_AFTER = getattr(settings, 'DEVICE_OFFLINE_AFTER', 90)
+
+
+class HeartbeatTracker:
+    """Records device liveness in memory and writes it back in batches.
+
+    Readers call beat() on every heartbeat (or scan); at most once per
+    ``flush_interval`` seconds the pending lastSeen values are written with a
+    single UPDATE and Device.status is re-derived from ``offline_after``.
+    The flush piggybacks on incoming requests, so no background thread is needed.
+    """
+
+    def __init__(self, flush_interval=HEARTBEAT_FLUSH_INTERVAL, offline_after=DEVICE_OFFLINE_AFTER):
+        self.flush_interval = flush_interval
+        self.offline_after = timedelta(seconds=offline_after)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._last_seen = {}
+        self._known_ids = None
+        self._last_flush = time.monotonic()
+
+    def _known(self):
+        if self._known_ids is None:
+            self._known_ids = set(Device.objects.values_list('id', flat=True))
+        return self._known_ids
+
+    def device_added(self, device_id):
+        if self._known_ids is not None:
+            self._known_ids.add(device_id)
+
+    def device_removed(self, device_id):
+        if self._known_ids is not None:
+            self._known_ids.discard(device_id)
+        with self._lock:
+            self._pending.pop(device_id, None)
+            self._last_seen.pop(device_id, None)
+
+    def beat(self, device_ids, when=None):
+        """Record a heartbeat for ``device_ids``; returns the ids that are not known devices."""
+        when = when or timezone.now()
+        known = self._known()
+        unknown = []
+        with self._lock:
+            for device_id in device_ids:
+                if device_id not in known:
+                    unknown.append(device_id)
+                    continue
+                previous = self._last_seen.get(device_id)
+                if previous is None or when > previous:
+                    self._last_seen[device_id] = when
+                    self._pending[device_id] = when
+        self.maybe_flush()
+        return unknown
+
+    def is_online(self, last_seen, now=None):
+        now = now or timezone.now()
+        return last_seen is not None and now - last_seen <= self.offline_after
+
+    def last_seen(self, device_id):
+        return self._last_seen.get(device_id)
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _online_ids(self):
+        return set(
+            Device.objects.filter(status=Device.DeviceStatus.ONLINE).values_list('id', flat=True)
+        )
+
+    def flush(self):
+        # A second caller arriving mid-flush just skips; the next request catches up.
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+
+            now = timezone.now()
+            cutoff = now - self.offline_after
+            with transaction.atomic():
+                online_before = self._online_ids()
+                if pending:
+                    Device.objects.filter(id__in=pending).update(
+                        lastSeen=Case(
+                            *[When(id=device_id, then=Value(seen)) for device_id, seen in pending.items()],
+                            output_field=DateTimeField(),
+                        ),
+                        status=Case(
+                            *[When(id=device_id, then=Value(Device.DeviceStatus.ONLINE))
+                              for device_id, seen in pending.items() if seen >= cutoff],
+                            default=Value(Device.DeviceStatus.OFFLINE),
+                        ),
+                    )
+                Device.objects.filter(
+                    Q(lastSeen__lt=cutoff) | Q(lastSeen__isnull=True), status=Device.DeviceStatus.ONLINE
+                ).update(status=Device.DeviceStatus.OFFLINE)
+                online_after = self._online_ids()
+
+            if online_after != online_before:
+                stats_cache.changed()
+            broadcaster.publish_device_status(
+                online_after - online_before, online_before - online_after, now
+            )
+            self._known_ids = set(Device.objects.values_list('id', flat=True))
+        except Exception:
+            # Keep the batch for the next flush; newer beats recorded meanwhile win.
+            with self._lock:
+                self._pending = {**pending, **self._pending}
+            raise
+        finally:
+            self._flush_lock.release()
+
+    def apply(self, devices):
+        """Overlay in-memory lastSeen/status onto Device instances about to be serialized.
+
+        Status depends only on heartbeat times: the ones this process holds
+        and the ones flushed to lastSeen, which nothing else writes.
+        """
+        devices = list(devices)
+        now = timezone.now()
+        for device in devices:
+            seen = self._last_seen.get(device.id)
+            if seen is not None and (device.lastSeen is None or seen > device.lastSeen):
+                device.lastSeen = seen
+            device.status = (
+                Device.DeviceStatus.ONLINE if self.is_online(device.lastSeen, now)
+                else Device.DeviceStatus.OFFLINE
+            )
+        return devices
+
+    def clear(self):
+        with self._lock:
+            self._pending = {}
+            self._last_seen = {}
+            self._known_ids = None
+
+
+heartbeat_tracker = HeartbeatTracker()
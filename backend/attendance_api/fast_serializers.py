@@ -0,0 +1,116 @@
+from operator import itemgetter
+
+from rest_framework import serializers
+
+from .serializers import StudentSerializer, TeacherSerializer, ProgramSerializer, TimetableEntrySerializer, \
+    ScanEventSerializer
+
+# Reuse DRF's own field formatting so the fast path stays byte-identical
+_datetime = serializers.DateTimeField().to_representation
+_time = serializers.TimeField().to_representation
+
+
+def _flag(value):
+    return 1 if value else 0
+
+
+class FastSerializer:
+    """Read-only serializer that turns ``values_list()`` tuples straight into dicts.
+
+    Output keys, order and formatting mirror ``serializer_class`` exactly; only
+    the per-field DRF machinery is skipped. ``columns`` maps output names to
+    ORM lookups, ``converters`` post-processes individual values and
+    ``omit_if_null`` lists fields DRF skips when their source relation is empty.
+    """
+    serializer_class = None
+    columns = {}
+    converters = {}
+    omit_if_null = ()
+
+    def __init__(self, fields=None):
+        readable = [
+            name for name, field in self.serializer_class().fields.items()
+            if not field.write_only
+        ]
+        self.names = [name for name in readable if fields is None or name in fields]
+        # id always travels last so keyset pagination can read it from the tuple
+        self.lookups = [self.columns.get(name, name) for name in self.names] + ['id']
+        self.conversions = [
+            (name, self.converters[name]) for name in self.names if name in self.converters
+        ]
+        self.omitted = [name for name in self.names if name in self.omit_if_null]
+
+    row_id = staticmethod(itemgetter(-1))
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.lookups)
+
+    def to_data(self, rows):
+        names = self.names
+        conversions = self.conversions
+        omitted = self.omitted
+        data = []
+        for row in rows:
+            item = dict(zip(names, row))
+            for name, convert in conversions:
+                item[name] = convert(item[name])
+            for name in omitted:
+                if item[name] is None:
+                    del item[name]
+            data.append(item)
+        return data
+
+
+class FastStudentSerializer(FastSerializer):
+    serializer_class = StudentSerializer
+    converters = {
+        'id': str,
+        'hasRfid': _flag,
+        'hasFingerprint': _flag,
+    }
+
+
+class FastTeacherSerializer(FastSerializer):
+    serializer_class = TeacherSerializer
+    converters = {
+        'id': str,
+        'hasRfid': _flag,
+        'hasFingerprint': _flag,
+    }
+
+
+class FastProgramSerializer(FastSerializer):
+    serializer_class = ProgramSerializer
+
+
+class FastTimetableEntrySerializer(FastSerializer):
+    serializer_class = TimetableEntrySerializer
+    columns = {
+        'program_name': 'program__name',
+        'course_name': 'course__name',
+        'teacher_name': 'teacher__name',
+        'device_name': 'device__name',
+    }
+    # teacher_name has no allow_null, so DRF leaves the key out for unassigned entries
+    omit_if_null = ('teacher_name',)
+    converters = {
+        'id': str,
+        'startTime': _time,
+        'endTime': _time,
+        'created_at': _datetime,
+        'updated_at': _datetime,
+    }
+
+
+class FastScanEventSerializer(FastSerializer):
+    serializer_class = ScanEventSerializer
+    columns = {
+        'device_name': 'device__name',
+        'student_name': 'student__name',
+        'teacher_name': 'teacher__name',
+    }
+    converters = {
+        'id': str,
+        'timestamp': _datetime,
+        'received_at': _datetime,
+    }
@@ -0,0 +1,32 @@
+"""Password hashers whose cost comes from settings.
+
+Each keeps the algorithm name of the Django hasher it extends, so existing
+hashes still verify. ``must_update`` compares the stored cost with the
+configured one, so changing a cost setting (or PASSWORD_HASHER) rehashes each
+user on their next successful login (see User.check_password).
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', ScryptPasswordHasher.work_factor)
+    block_size = getattr(settings, 'PASSWORD_SCRYPT_BLOCK_SIZE', ScryptPasswordHasher.block_size)
+    parallelism = getattr(settings, 'PASSWORD_SCRYPT_PARALLELISM', ScryptPasswordHasher.parallelism)
+
+
+class TunableArgon2PasswordHasher(Argon2PasswordHasher):
+    """Needs the optional ``argon2-cffi`` package (only when actually used)."""
+    time_cost = getattr(settings, 'PASSWORD_ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
+
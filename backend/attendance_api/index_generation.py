@@ -0,0 +1,56 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# How often a process-local index asks the shared cache whether its source
+# rows changed, so a change made on another worker shows up within this many
+# seconds. Lookups in between (hits and misses alike) touch no shared store.
+INDEX_GENERATION_CHECK_INTERVAL = getattr(settings, 'INDEX_GENERATION_CHECK_INTERVAL', 1.0)
+
+
+class IndexGeneration:
+    """Change marker for a process-local index or cache, shared between workers through the default cache.
+
+    Writers call bump(), which publishes a new marker once the transaction
+    commits (a rolled-back write publishes nothing); each index remembers
+    the marker it loaded and reloads when the shared one moves. With a
+    per-process cache (locmem) this only covers the writing process, as
+    every other cache entry does.
+    """
+
+    def __init__(self, name, check_interval=INDEX_GENERATION_CHECK_INTERVAL):
+        self.key = f'attendance_api:{name}:generation'
+        self.check_interval = check_interval
+        self._loaded = None
+        self._checked_at = 0.0
+
+    def current(self):
+        return cache.get(self.key)
+
+    def loaded(self, generation):
+        """Record the generation read just before the index was (re)built."""
+        self._loaded = generation
+        self._checked_at = time.monotonic()
+
+    def changed(self, force=False):
+        """Whether the shared generation moved since the last load, asking at most every check_interval."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return self.current() != self._loaded
+
+    def bump(self, then=None):
+        """Publish a new generation on commit, then run ``then`` (e.g. dropping the local copy)."""
+
+        def publish():
+            # A fresh random token rather than incr(): it needs no initial value and
+            # can never come back to one an index already loaded after an eviction
+            cache.set(self.key, uuid.uuid4().hex, timeout=None)
+            if then is not None:
+                then()
+
+        transaction.on_commit(publish)
@@ -0,0 +1,262 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Device, ScanEvent
+from .credential_index import credential_index
+from .timetable_index import timetable_index
+from .device_heartbeat import heartbeat_tracker
+from .rollups import apply_scan_events
+from .scan_dedup import swipe_deduper
+from .live_events import broadcaster
+from .partitions import period_of
+
+INGEST_BATCH_SIZE = getattr(settings, 'SCAN_INGEST_BATCH_SIZE', 1000)
+MAX_EVENTS_PER_REQUEST = getattr(settings, 'SCAN_MAX_EVENTS_PER_REQUEST', 10000)
+REPLAY_MAX_EVENTS = getattr(settings, 'SCAN_REPLAY_MAX_EVENTS', 100000)
+REPLAY_CHUNK_SIZE = getattr(settings, 'SCAN_REPLAY_CHUNK_SIZE', 5000)
+# A scan more than this many minutes after the session start is "late"
+ATTENDANCE_GRACE_MINUTES = getattr(settings, 'ATTENDANCE_GRACE_MINUTES', 10)
+
+
+class IngestResult:
+    def __init__(self):
+        self.accepted = 0
+        self.duplicates = 0
+        self.already_stored = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, index, message):
+        self.rejected += 1
+        self.errors.append({'index': index, 'message': message})
+
+    def to_dict(self):
+        return {
+            'accepted': self.accepted,
+            'duplicates': self.duplicates,
+            'already_stored': self.already_stored,
+            'rejected': self.rejected,
+            'errors': self.errors,
+        }
+
+
+def parse_timestamp(value):
+    """Accept ISO-8601 strings or epoch seconds; naive values are taken as local time."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value, tz=timezone.get_current_timezone())
+        except (OverflowError, OSError, ValueError):
+            return None
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def attendance_status(local, start_time):
+    """Classify a scan (local time) that falls inside a session starting at ``start_time``."""
+    cutoff = datetime.combine(local.date(), start_time) + timedelta(minutes=ATTENDANCE_GRACE_MINUTES)
+    if local.replace(tzinfo=None) > cutoff:
+        return ScanEvent.ScanStatus.LATE
+    return ScanEvent.ScanStatus.PRESENT
+
+
+def _coerce_id(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _known_device_ids(raw_events):
+    device_ids = set()
+    for event in raw_events:
+        if isinstance(event, dict):
+            device_id = _coerce_id(event.get('device_id'))
+            if device_id is not None:
+                device_ids.add(device_id)
+    if not device_ids:
+        return set()
+    return set(Device.objects.filter(id__in=device_ids).values_list('id', flat=True))
+
+
+def _sequence_pairs(raw_events, known_devices):
+    pairs = set()
+    for event in raw_events:
+        if isinstance(event, dict) and event.get('sequence') is not None:
+            device_id = _coerce_id(event.get('device_id'))
+            sequence = _coerce_id(event.get('sequence'))
+            if device_id in known_devices and sequence is not None:
+                pairs.add((device_id, sequence))
+    return pairs
+
+
+def _stored_sequences(pairs):
+    """The (device, sequence) ``pairs`` that are already stored.
+
+    One range scan of the (device, sequence) unique index per device, so the
+    cost does not depend on how many sequences are checked.
+    """
+    ranges = {}
+    for device_id, sequence in pairs:
+        low, high = ranges.get(device_id, (sequence, sequence))
+        ranges[device_id] = (min(low, sequence), max(high, sequence))
+
+    stored = set()
+    for device_id, bounds in ranges.items():
+        stored.update(
+            (device_id, sequence) for sequence in ScanEvent.objects.filter(
+                device_id=device_id, sequence__range=bounds
+            ).values_list('sequence', flat=True)
+        )
+    return stored & set(pairs)
+
+
+def build_scan_events(raw_events, result, require_sequence=False):
+    """Validate raw payload dicts and return unsaved ScanEvent instances.
+
+    Device existence is checked with a single query for the whole batch;
+    invalid items are recorded on ``result`` and skipped, and repeat reads of
+    a tag are dropped by the swipe deduper before they reach the database.
+    Events whose (device, sequence) is already stored, or repeated within
+    the payload, are counted and skipped.
+    """
+    known_devices = _known_device_ids(raw_events)
+    stored = _stored_sequences(_sequence_pairs(raw_events, known_devices))
+    tz = timezone.get_current_timezone()
+    events = []
+    sequences = set()
+
+    for index, raw in enumerate(raw_events):
+        if not isinstance(raw, dict):
+            result.reject(index, 'Event must be an object')
+            continue
+
+        device_id = _coerce_id(raw.get('device_id'))
+        if device_id not in known_devices:
+            result.reject(index, 'Unknown device_id')
+            continue
+
+        tag_uid = raw.get('tag_uid')
+        if not isinstance(tag_uid, str) or not tag_uid.strip():
+            result.reject(index, 'tag_uid is required')
+            continue
+        tag_uid = tag_uid.strip()
+        if len(tag_uid) > 100:
+            result.reject(index, 'tag_uid is too long')
+            continue
+
+        timestamp = parse_timestamp(raw.get('timestamp'))
+        if timestamp is None:
+            result.reject(index, 'Invalid timestamp')
+            continue
+
+        sequence = raw.get('sequence')
+        if sequence is not None:
+            sequence = _coerce_id(sequence)
+            if sequence is None or sequence < 0:
+                result.reject(index, 'sequence must be a non-negative integer')
+                continue
+            if (device_id, sequence) in stored:
+                result.already_stored += 1
+                continue
+            if (device_id, sequence) in sequences:
+                result.duplicates += 1
+                continue
+            sequences.add((device_id, sequence))
+        elif require_sequence:
+            result.reject(index, 'sequence is required')
+            continue
+
+        if swipe_deduper.is_duplicate(device_id, tag_uid, timestamp):
+            result.duplicates += 1
+            continue
+
+        student_id, teacher_id = credential_index.resolve(tag_uid) or (None, None)
+
+        local = timestamp.astimezone(tz)
+        session = timetable_index.active_session(device_id, local)
+        if session is None:
+            entry_id, scan_status = None, ScanEvent.ScanStatus.OUT_OF_SESSION
+        else:
+            entry_id, scan_status = session[0], attendance_status(local, session[1])
+
+        events.append(ScanEvent(
+            device_id=device_id,
+            tag_uid=tag_uid,
+            timestamp=timestamp,
+            student_id=student_id,
+            teacher_id=teacher_id,
+            timetable_entry_id=entry_id,
+            sequence=sequence,
+            status=scan_status,
+            period=period_of(local, tz),
+        ))
+
+    return events
+
+
+def _store(events, result):
+    with transaction.atomic():
+        pairs = {(event.device_id, event.sequence) for event in events if event.sequence is not None}
+        if pairs:
+            # A concurrent resend of the same backlog waits here for this one
+            # to commit, then finds its sequences stored and skips them
+            list(
+                Device.objects.select_for_update()
+                .filter(id__in={device_id for device_id, _ in pairs})
+                .order_by('id').values_list('id', flat=True)
+            )
+            stored = _stored_sequences(pairs)
+            if stored:
+                events = [event for event in events if (event.device_id, event.sequence) not in stored]
+                result.already_stored += len(stored)
+        if not events:
+            return
+        ScanEvent.objects.bulk_create(events, batch_size=INGEST_BATCH_SIZE)
+        apply_scan_events(events)
+        transaction.on_commit(lambda: broadcaster.publish_scans(events))
+    result.accepted += len(events)
+
+
+def ingest_scan_events(raw_events, require_sequence=False, chunk_size=None):
+    """Validate and persist raw scan events.
+
+    Events that carry a ``sequence`` are idempotent: ones already stored for
+    that device are skipped. With ``chunk_size`` each chunk commits on its
+    own, so a large replay keeps its progress if a later chunk fails.
+    """
+    result = IngestResult()
+    events = build_scan_events(raw_events, result, require_sequence)
+
+    if events:
+        size = chunk_size or len(events)
+        if chunk_size:
+            # Keeps each session's scans in as few chunks as possible, so the
+            # rollups mostly insert rather than update rows
+            events.sort(key=lambda event: event.timestamp)
+        for start in range(0, len(events), size):
+            chunk = events[start:start + size]
+            try:
+                _store(chunk, result)
+            except Exception:
+                swipe_deduper.forget(events[start:])
+                raise
+        # A reader that sends scans is alive even if it skips heartbeats
+        heartbeat_tracker.beat({event.device_id for event in events})
+
+    return result
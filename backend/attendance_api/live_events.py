@@ -0,0 +1,125 @@
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+
+from .timetable_index import timetable_index
+
+LIVE_SUBSCRIBER_QUEUE_SIZE = getattr(settings, 'LIVE_SUBSCRIBER_QUEUE_SIZE', 1000)
+
+
+class Subscription:
+    """One connected dashboard: its filters and a queue on its event loop."""
+
+    def __init__(self, loop, types=None, programs=None, courses=None, devices=None,
+                 queue_size=LIVE_SUBSCRIBER_QUEUE_SIZE):
+        self.loop = loop
+        self.types = types
+        self.programs = programs
+        self.courses = courses
+        self.devices = devices
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def wants(self, event):
+        if self.types is not None and event['type'] not in self.types:
+            return False
+        if self.devices is not None and event.get('device') not in self.devices:
+            return False
+        if self.programs is not None and event.get('program') not in self.programs:
+            return False
+        if self.courses is not None and event.get('course') not in self.courses:
+            return False
+        return True
+
+    def _deliver(self, messages):
+        # Runs on the subscriber's loop; a dashboard that cannot keep up loses
+        # events rather than holding memory for everyone else
+        for message in messages:
+            try:
+                self.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+
+class Broadcaster:
+    """In-process fan-out of attendance and device events to SSE subscribers.
+
+    publish() may be called from any thread (ingest runs in the sync worker
+    thread). Each event is encoded once and then handed to every matching
+    subscriber's loop with a single call_soon_threadsafe per subscriber per
+    batch, so hundreds of dashboards cost one filter pass per event.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self.published = 0
+
+    def subscribe(self, subscription):
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, events):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers or not events:
+            return
+        self.published += len(events)
+
+        encoded = [(event, json.dumps(event, separators=(',', ':'))) for event in events]
+        for subscription in subscribers:
+            messages = [
+                f"event: {event['type']}\ndata: {data}\n\n"
+                for event, data in encoded if subscription.wants(event)
+            ]
+            if messages:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription._deliver, messages)
+                except RuntimeError:
+                    # Loop already closed: the client went away
+                    self.unsubscribe(subscription)
+
+    def publish_scans(self, scans):
+        if not self._subscribers:
+            return
+        events = []
+        for scan in scans:
+            program_id, course_id = timetable_index.entry_info(scan.timetable_entry_id) or (None, None)
+            events.append({
+                'type': 'scan',
+                'id': scan.pk,
+                'device': scan.device_id,
+                'tag_uid': scan.tag_uid,
+                'timestamp': scan.timestamp.isoformat(),
+                'student': scan.student_id,
+                'teacher': scan.teacher_id,
+                'timetable_entry': scan.timetable_entry_id,
+                'program': program_id,
+                'course': course_id,
+                'status': scan.status,
+            })
+        self.publish(events)
+
+    def publish_device_status(self, went_online, went_offline, when):
+        if not self._subscribers:
+            return
+        self.publish(
+            [{'type': 'device', 'device': device_id, 'status': 'online', 'at': when.isoformat()}
+             for device_id in sorted(went_online)] +
+            [{'type': 'device', 'device': device_id, 'status': 'offline', 'at': when.isoformat()}
+             for device_id in sorted(went_offline)]
+        )
+
+
+broadcaster = Broadcaster()
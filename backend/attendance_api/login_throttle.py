@@ -0,0 +1,75 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOGIN_FAILURES_PER_IP = getattr(settings, 'LOGIN_FAILURES_PER_IP', 30)
+LOGIN_FAILURES_PER_IP_EMAIL = getattr(settings, 'LOGIN_FAILURES_PER_IP_EMAIL', 5)
+LOGIN_THROTTLE_WINDOW = getattr(settings, 'LOGIN_THROTTLE_WINDOW', 300)
+TRUSTED_PROXY_HEADER = getattr(settings, 'TRUSTED_PROXY_HEADER', None)
+TRUSTED_PROXY_COUNT = getattr(settings, 'TRUSTED_PROXY_COUNT', 1)
+
+KEY_PREFIX = 'attendance_api.login:'
+
+
+def _key(kind, value):
+    digest = hashlib.sha256(value.encode()).hexdigest()
+    return f'{KEY_PREFIX}{kind}:{digest}'
+
+
+def _count(key):
+    return cache.get(key, 0)
+
+
+def _increment(key):
+    # add() starts a fixed window; incr() keeps the original expiry
+    if not cache.add(key, 1, LOGIN_THROTTLE_WINDOW):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, LOGIN_THROTTLE_WINDOW)
+
+
+def client_ip(request):
+    """The client address, read from TRUSTED_PROXY_HEADER when running behind proxies.
+
+    Each of the TRUSTED_PROXY_COUNT proxies appends the address it received
+    the request from, so the client is that many entries from the right;
+    anything further left is supplied by the client and not trusted.
+    """
+    if TRUSTED_PROXY_HEADER:
+        forwarded = [
+            part.strip() for part in request.META.get(TRUSTED_PROXY_HEADER, '').split(',') if part.strip()
+        ]
+        if len(forwarded) >= TRUSTED_PROXY_COUNT:
+            return forwarded[-TRUSTED_PROXY_COUNT]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class LoginThrottle:
+    """Fixed-window limits on failed logins per client IP and per (IP, email).
+
+    Only failures count, so a burst of valid logins from one address (a
+    shift change behind NAT) is never throttled. Locking an email is scoped
+    to the address the failures came from, so guessing from elsewhere can't
+    lock its owner out. Checked before the password is hashed, so a flood of
+    guesses costs a cache lookup instead of a full hash.
+    """
+
+    def __init__(self, request, email):
+        ip = client_ip(request)
+        self.ip_key = _key('ip', ip)
+        self.ip_email_key = _key('ip-email', f"{ip} {(email or '').strip().lower()}")
+
+    def blocked(self):
+        return (
+            _count(self.ip_key) >= LOGIN_FAILURES_PER_IP
+            or _count(self.ip_email_key) >= LOGIN_FAILURES_PER_IP_EMAIL
+        )
+
+    def failed(self):
+        _increment(self.ip_key)
+        _increment(self.ip_email_key)
+
+    def succeeded(self):
+        cache.delete(self.ip_email_key)
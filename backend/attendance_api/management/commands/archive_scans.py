@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance_api.models import ScanEvent
+from attendance_api.partitions import (
+    SCAN_ARCHIVE_DIR, SCAN_ARCHIVE_RETAIN_MONTHS, archivable_periods, archive_cutoff, archive_period,
+)
+
+
+class Command(BaseCommand):
+    help = 'Moves closed monthly scan partitions to gzipped NDJSON files and deletes them from the table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retain-months', type=int, default=SCAN_ARCHIVE_RETAIN_MONTHS,
+            help='Months kept live, counting the current one back',
+        )
+        parser.add_argument('--period', type=int, action='append', help='Archive only this YYYYMM (repeatable)')
+        parser.add_argument('--directory', default=SCAN_ARCHIVE_DIR)
+        parser.add_argument('--dry-run', action='store_true', help='List what would be archived')
+
+    def handle(self, *args, **options):
+        if options['retain_months'] < 1:
+            raise CommandError('--retain-months must be at least 1 (the current month is never closed)')
+        cutoff = archive_cutoff(options['retain_months'])
+
+        periods = archivable_periods(cutoff)
+        if options['period']:
+            too_recent = [period for period in options['period'] if period >= cutoff]
+            if too_recent:
+                raise CommandError(
+                    f"Period(s) {', '.join(map(str, too_recent))} are within the last "
+                    f"{options['retain_months']} month(s); lower --retain-months to archive them"
+                )
+            periods = [period for period in periods if period in options['period']]
+
+        if not periods:
+            self.stdout.write(f'Nothing to archive before {cutoff}')
+            return
+
+        for period in periods:
+            if options['dry_run']:
+                count = ScanEvent.objects.filter(period=period).count()
+                self.stdout.write(f'{period}: {count} scans would be archived')
+                continue
+
+            partition = archive_period(period, options['directory'])
+            if partition is None:
+                self.stdout.write(f'{period}: already archived')
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f'{period}: {partition.row_count} scans -> {partition.path} '
+                f'({partition.size_bytes / 1024:.0f} KiB)'
+            ))
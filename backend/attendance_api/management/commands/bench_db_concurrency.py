@@ -0,0 +1,206 @@
+import os
+import random
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+TABLE = 'bench_db_concurrency_scan'
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.write_latencies = []
+        self.read_latencies = []
+        self.write_errors = 0
+        self.read_errors = 0
+        self.rows = 0
+
+    def wrote(self, elapsed, rows):
+        with self._lock:
+            self.write_latencies.append(elapsed)
+            self.rows += rows
+
+    def read(self, elapsed):
+        with self._lock:
+            self.read_latencies.append(elapsed)
+
+    def failed(self, kind):
+        with self._lock:
+            if kind == 'write':
+                self.write_errors += 1
+            else:
+                self.read_errors += 1
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs concurrent scan-sized write transactions alongside readers and reports '
+        'throughput, latency and lock errors per database profile'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile', action='append', dest='profiles',
+            help="A SQLITE_PROFILES name or 'configured' (the default database's engine "
+                 "and options). Every profile runs in a scratch database that is removed "
+                 "afterwards. Repeatable; defaults to every SQLite profile on SQLite and "
+                 "'configured' otherwise.",
+        )
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--batches', type=int, default=50, help='Transactions per writer')
+        parser.add_argument('--batch-size', type=int, default=20, help='Rows per transaction')
+
+    def handle(self, *args, **options):
+        sqlite_profiles = getattr(settings, 'SQLITE_PROFILES', {})
+        profiles = options['profiles']
+        if not profiles:
+            if connections['default'].vendor == 'sqlite':
+                profiles = list(sqlite_profiles)
+            else:
+                profiles = ['configured']
+
+        unknown = [name for name in profiles if name != 'configured' and name not in sqlite_profiles]
+        if unknown:
+            raise CommandError(f"Unknown profile(s): {', '.join(unknown)}")
+
+        self.stdout.write(
+            f"{options['writers']} writers x {options['batches']} transactions x "
+            f"{options['batch_size']} rows, {options['readers']} readers"
+        )
+        with tempfile.TemporaryDirectory() as scratch:
+            for name in profiles:
+                settings_dict = dict(connections['default'].settings_dict)
+                if name != 'configured':
+                    settings_dict.update(
+                        ENGINE='django.db.backends.sqlite3',
+                        OPTIONS=dict(sqlite_profiles[name]),
+                    )
+                if settings_dict['ENGINE'] == 'django.db.backends.sqlite3':
+                    settings_dict['NAME'] = os.path.join(scratch, f'{name}.sqlite3')
+                else:
+                    # Server databases get a throwaway database next to the real one
+                    settings_dict['TEST'] = dict(settings_dict['TEST'], NAME=f"bench_{settings_dict['NAME']}")
+                self._report(name, self._run(f'bench_{name}', settings_dict, options))
+
+    def _run(self, alias, settings_dict, options):
+        connections.settings[alias] = settings_dict
+        connection = connections[alias]
+        server_database = None
+        try:
+            if connection.vendor != 'sqlite':
+                # The documented test-database API: it creates TEST['NAME'] (dropping a
+                # leftover one), points the alias at it and migrates it, and
+                # destroy_test_db() below drops it and restores the name
+                server_database = settings_dict['NAME']
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'CREATE TABLE {TABLE} (device_id integer NOT NULL, card varchar(64) NOT NULL, '
+                    f'ts double precision NOT NULL)'
+                )
+                cursor.execute(f'CREATE INDEX {TABLE}_device_ts ON {TABLE} (device_id, ts)')
+            connection.close()
+
+            stats = _Stats()
+            done = threading.Event()
+            writers = [
+                threading.Thread(target=self._writer, args=(alias, device_id, options, stats))
+                for device_id in range(options['writers'])
+            ]
+            readers = [
+                threading.Thread(target=self._reader, args=(alias, done, stats))
+                for _ in range(options['readers'])
+            ]
+
+            started = time.perf_counter()
+            for thread in writers + readers:
+                thread.start()
+            for thread in writers:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            done.set()
+            for thread in readers:
+                thread.join()
+            return stats, elapsed
+        finally:
+            connection.close()
+            if server_database is not None:
+                connection.creation.destroy_test_db(server_database, verbosity=0)
+            del connections.settings[alias]
+
+    def _writer(self, alias, device_id, options, stats):
+        # Same shape as ingest: look up what the device already sent, then insert
+        connection = connections[alias]
+        try:
+            for _ in range(options['batches']):
+                now = time.time()
+                rows = [
+                    (device_id, f'{random.getrandbits(40):010x}', now + i / 1000)
+                    for i in range(options['batch_size'])
+                ]
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic(using=alias):
+                        with connection.cursor() as cursor:
+                            cursor.execute(
+                                f'SELECT MAX(ts) FROM {TABLE} WHERE device_id = %s', [device_id]
+                            )
+                            cursor.executemany(
+                                f'INSERT INTO {TABLE} (device_id, card, ts) VALUES (%s, %s, %s)', rows
+                            )
+                except OperationalError:
+                    stats.failed('write')
+                    continue
+                stats.wrote(time.perf_counter() - started, len(rows))
+        finally:
+            connection.close()
+
+    def _reader(self, alias, done, stats):
+        connection = connections[alias]
+        try:
+            while not done.is_set():
+                started = time.perf_counter()
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            f'SELECT COUNT(*), MAX(ts) FROM {TABLE} WHERE ts >= %s', [time.time() - 60]
+                        )
+                        cursor.fetchone()
+                except OperationalError:
+                    stats.failed('read')
+                    continue
+                stats.read(time.perf_counter() - started)
+        finally:
+            connection.close()
+
+    def _report(self, name, result):
+        stats, elapsed = result
+        writes, reads = stats.write_latencies, stats.read_latencies
+        self.stdout.write(f'{name}')
+        self.stdout.write(
+            f'  writes: {stats.rows / elapsed:9.0f} rows/s  '
+            f'p50 {_percentile(writes, 0.5) * 1000:7.1f} ms  '
+            f'p95 {_percentile(writes, 0.95) * 1000:7.1f} ms  '
+            f'{len(writes)} committed'
+        )
+        self.stdout.write(
+            f'  reads:  {len(reads) / elapsed:9.0f} q/s     '
+            f'p50 {_percentile(reads, 0.5) * 1000:7.1f} ms  '
+            f'p95 {_percentile(reads, 0.95) * 1000:7.1f} ms'
+        )
+        errors = stats.write_errors + stats.read_errors
+        message = f'  lock errors: {stats.write_errors} writes, {stats.read_errors} reads'
+        self.stdout.write(self.style.ERROR(message) if errors else self.style.SUCCESS(message))
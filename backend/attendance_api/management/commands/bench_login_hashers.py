@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers_by_algorithm
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Measures password verifications (i.e. logins) per second on one core for each configured hasher'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2.0, help='Time budget per hasher')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Policy: PASSWORD_HASHER={settings.PASSWORD_HASHER}')
+        for algorithm, hasher in get_hashers_by_algorithm().items():
+            try:
+                encoded = hasher.encode('bench-password', hasher.salt())
+            except ValueError as exc:
+                # e.g. argon2-cffi not installed
+                self.stdout.write(self.style.WARNING(f'  {algorithm:<14} skipped: {exc}'))
+                continue
+
+            count = 0
+            started = time.perf_counter()
+            while True:
+                hasher.verify('bench-password', encoded)
+                count += 1
+                elapsed = time.perf_counter() - started
+                if elapsed >= options['seconds']:
+                    break
+
+            cost = ', '.join(
+                f'{key}={value}' for key, value in hasher.safe_summary(encoded).items()
+                if key not in ('algorithm', 'salt', 'hash')
+            )
+            self.stdout.write(
+                f'  {algorithm:<14} {elapsed / count * 1000:8.1f} ms/login  '
+                f'{count / elapsed:8.1f} logins/s/core  ({cost})'
+            )
@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from attendance_api.models import Student
+from attendance_api.serializers import StudentSerializer
+from attendance_api.fast_serializers import FastStudentSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compares DRF and fast-path list serialization of students (rows are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        for count in options['rows']:
+            try:
+                with transaction.atomic():
+                    self._run(count, options['repeat'])
+                    raise _Rollback()
+            except _Rollback:
+                pass
+
+    def _best_of(self, repeat, func):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def _run(self, count, repeat):
+        Student.objects.bulk_create(
+            [
+                Student(
+                    name=f'Bench Student {i}',
+                    regNumber=f'BENCH/{i:07d}',
+                    program='BENCH',
+                    year=i % 4 + 1,
+                    hasRfid=i % 2 == 0,
+                    hasFingerprint=i % 3 == 0,
+                )
+                for i in range(count)
+            ],
+            batch_size=2000,
+        )
+        queryset = Student.objects.filter(program='BENCH').order_by('id')
+        render = JSONRenderer().render
+
+        drf_time, drf_bytes = self._best_of(
+            repeat, lambda: render(StudentSerializer(queryset, many=True).data)
+        )
+
+        fast = FastStudentSerializer()
+        fast_time, fast_bytes = self._best_of(
+            repeat, lambda: render(fast.to_data(fast.rows(queryset)))
+        )
+
+        self.stdout.write(f'{count} rows')
+        self.stdout.write(f'  DRF ModelSerializer: {drf_time * 1000:9.1f} ms')
+        self.stdout.write(f'  Fast values_list:    {fast_time * 1000:9.1f} ms')
+        self.stdout.write(f'  Speedup:             {drf_time / fast_time:9.1f}x')
+        if drf_bytes == fast_bytes:
+            self.stdout.write(self.style.SUCCESS('  Output is byte-identical'))
+        else:
+            self.stdout.write(self.style.ERROR('  Output differs!'))
@@ -0,0 +1,128 @@
+import re
+from datetime import timedelta
+from itertools import combinations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from attendance_api.models import TimetableEntry, ScanEvent, SessionRollup, AttendanceRollup, Student
+from attendance_api.old_views import filter_timetable_entries
+from attendance_api.views.attendance_views import filter_scan_events
+from attendance_api.fast_serializers import FastTimetableEntrySerializer, FastScanEventSerializer
+
+# Filter name -> query params it sets
+TIMETABLE_FILTERS = {
+    'program': {'program': '1'},
+    'year': {'year': '1'},
+    'teacher': {'teacher': '1'},
+    'location': {'location': 'lab'},
+    'day': {'day': 'Monday'},
+    'qualification': {'qualification': 'dip'},
+}
+
+SCAN_FILTERS = {
+    'status': {'status': 'late'},
+    'device': {'device': '1'},
+    'student': {'student': '1'},
+    'teacher': {'teacher': '1'},
+    'period': None,  # ?start=&end=, filled in at run time
+}
+
+# Substring filters (icontains) can only use an index through pg_trgm
+SUBSTRING_FILTERS = {'location', 'qualification'}
+
+# SQLite: "SCAN t" (optionally "USING [COVERING] INDEX"); PostgreSQL: "Seq Scan on t"
+# (\b stops the lookahead from backtracking into the table name)
+SQLITE_SCAN = re.compile(r'\bSCAN (\w+)\b(?! USING)')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def full_scans(plan, vendor):
+    """Sorted names of the tables an EXPLAIN plan reads in full."""
+    pattern = POSTGRES_SCAN if vendor == 'postgresql' else SQLITE_SCAN
+    return sorted(set(pattern.findall(plan)))
+
+
+def _params(filters, names):
+    params = QueryDict(mutable=True)
+    for name in names:
+        params.update(filters[name])
+    return params
+
+
+class Command(BaseCommand):
+    help = 'EXPLAINs every list filter combination and flags full table scans (exit status 1 if any)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan')
+        parser.add_argument('--max-filters', type=int, default=None,
+                            help='Only combine up to this many filters per query')
+
+    def _queries(self, max_filters):
+        now = timezone.now()
+        scan_filters = dict(SCAN_FILTERS, period={
+            'start': (now - timedelta(days=1)).isoformat(), 'end': now.isoformat()
+        })
+
+        for size in range(0, min(max_filters or len(TIMETABLE_FILTERS), len(TIMETABLE_FILTERS)) + 1):
+            for names in combinations(TIMETABLE_FILTERS, size):
+                queryset = filter_timetable_entries(
+                    TimetableEntry.objects.all(), _params(TIMETABLE_FILTERS, names)
+                )
+                yield f"timetable/list ?{'&'.join(names) or '(no filters)'}", \
+                    FastTimetableEntrySerializer().rows(queryset).order_by('id'), set(names)
+
+        for size in range(1, min(max_filters or len(scan_filters), len(scan_filters)) + 1):
+            for names in combinations(scan_filters, size):
+                queryset = filter_scan_events(ScanEvent.objects.all(), _params(scan_filters, names))
+                yield f"attendance/list ?{'&'.join(names)}", \
+                    FastScanEventSerializer().rows(queryset).order_by('id'), set(names)
+
+        today = timezone.localdate()
+        yield 'reports/program sessions', SessionRollup.objects.filter(
+            program_id=1, date__gte=today - timedelta(days=180), date__lte=today
+        ), {'program'}
+        yield 'reports/program enrolment', Student.objects.filter(
+            program_lc__in=['cs', 'computing']
+        ).values('year'), {'program'}
+        yield 'reports/student attendance', AttendanceRollup.objects.filter(
+            student_id=1, date__gte=today - timedelta(days=180), date__lte=today
+        ), {'student'}
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        flagged = 0
+        expected = 0
+        total = 0
+
+        with transaction.atomic():
+            if vendor == 'postgresql':
+                # On small tables the planner prefers a seq scan even when an
+                # index exists; this asks "could an index serve it at all?"
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for label, queryset, filters in self._queries(options['max_filters']):
+                total += 1
+                plan = queryset.explain()
+                scanned = full_scans(plan, vendor)
+                if scanned and filters and vendor != 'postgresql' and filters <= SUBSTRING_FILTERS:
+                    expected += 1
+                    self.stdout.write(f"expected  {label}: substring match needs PostgreSQL pg_trgm")
+                elif scanned and filters:
+                    flagged += 1
+                    self.stdout.write(self.style.WARNING(f"SEQ SCAN  {label}: {', '.join(scanned)}"))
+                elif options['verbose_plans']:
+                    self.stdout.write(f'ok        {label}')
+                if options['verbose_plans']:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'            {line}')
+
+        summary = f'{total} queries explained on {vendor}, {flagged} with full table scans'
+        if expected:
+            summary += f' ({expected} more expected on {vendor})'
+        if flagged:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance_api.roster_import import import_roster, RosterImportError, ROSTERS
+
+
+class Command(BaseCommand):
+    help = 'Bulk upserts students or teachers from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('roster', choices=sorted(ROSTERS))
+        parser.add_argument('path', type=str)
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--report', type=str, help='Write the per-row error report as JSON to this file')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as handle:
+                report = import_roster(options['roster'], handle, chunk_size=options['chunk_size'])
+        except (OSError, RosterImportError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report.created}, updated {report.updated}, rejected {report.rejected}"
+        ))
+
+        for error in report.errors[:20]:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['errors']}"))
+        if len(report.errors) > 20:
+            self.stdout.write(self.style.WARNING(f"... and {len(report.errors) - 20} more"))
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as handle:
+                json.dump(report.to_dict(), handle, indent=2)
@@ -0,0 +1,164 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+# Per-route request metrics, kept per process and rendered in the Prometheus
+# text format by the /metrics endpoint. Each worker process reports its own
+# numbers, so scrape every worker (Prometheus sums them with sum by (route)).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class RequestStats:
+    """Database work done while serving one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_current_request = contextvars.ContextVar('attendance_request_stats', default=None)
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current_request.set(stats)
+
+
+def end_request(token):
+    _current_request.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper that charges each query to the request in the current context.
+
+    Installed once on every connection (see signals.py) rather than per
+    request, so queries run by sync views under ASGI, which execute in a
+    worker thread, are still counted: the context variable follows the call
+    into that thread.
+    """
+    stats = _current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+HISTOGRAMS = (
+    ('duration', 'attendance_http_request_duration_seconds', 'Request latency in seconds.', LATENCY_BUCKETS),
+    ('queries', 'attendance_http_request_db_queries', 'Database queries per request.', QUERY_COUNT_BUCKETS),
+    ('db_time', 'attendance_http_request_db_seconds', 'Time spent in database queries per request.', LATENCY_BUCKETS),
+    ('size', 'attendance_http_response_size_bytes', 'Response body size (streamed responses excluded).', SIZE_BUCKETS),
+)
+
+
+class RequestMetrics:
+    """Thread-safe per-(route, method) counters and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._over_budget = defaultdict(int)
+        self._histograms = {
+            key: defaultdict(lambda buckets=buckets: Histogram(buckets))
+            for key, _, _, buckets in HISTOGRAMS
+        }
+
+    def observe(self, route, method, status, duration, queries, db_time, size=None, over_budget=False):
+        key = (route, method)
+        with self._lock:
+            self._requests[key + (status,)] += 1
+            self._histograms['duration'][key].observe(duration)
+            self._histograms['queries'][key].observe(queries)
+            self._histograms['db_time'][key].observe(db_time)
+            if size is not None:
+                self._histograms['size'][key].observe(size)
+            if over_budget:
+                self._over_budget[key] += 1
+
+    def render(self):
+        """Everything recorded so far, in the Prometheus text exposition format."""
+        lines = [
+            '# HELP attendance_http_requests_total Requests served.',
+            '# TYPE attendance_http_requests_total counter',
+        ]
+        with self._lock:
+            for (route, method, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f'attendance_http_requests_total{_labels(route=route, method=method, status=status)} {count}'
+                )
+
+            for key, name, help_text, _ in HISTOGRAMS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (route, method), histogram in sorted(self._histograms[key].items()):
+                    for bound, total in histogram.cumulative():
+                        labels = _labels(route=route, method=method, le=_number(bound))
+                        lines.append(f'{name}_bucket{labels} {total}')
+                    labels = _labels(route=route, method=method)
+                    lines.append(f'{name}_sum{labels} {_number(histogram.sum)}')
+                    lines.append(f'{name}_count{labels} {histogram.count}')
+
+            lines.append('# HELP attendance_http_query_budget_exceeded_total Requests over METRICS_QUERY_BUDGET.')
+            lines.append('# TYPE attendance_http_query_budget_exceeded_total counter')
+            for (route, method), count in sorted(self._over_budget.items()):
+                lines.append(
+                    f'attendance_http_query_budget_exceeded_total{_labels(route=route, method=method)} {count}'
+                )
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._requests.clear()
+            self._over_budget.clear()
+            for histograms in self._histograms.values():
+                histograms.clear()
+
+
+request_metrics = RequestMetrics()
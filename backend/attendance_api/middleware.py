@@ -0,0 +1,115 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .metrics import UNMATCHED_ROUTE, end_request, request_metrics, start_request
+from .user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+METRICS_QUERY_BUDGET = getattr(settings, 'METRICS_QUERY_BUDGET', 50)
+
+
+def get_app_user(request):
+    """The signed-in ``attendance_api`` User for this request, or None.
+
+    Resolved from the session on first use and memoized on the request, so
+    views and permission checks can call this freely.
+    """
+    if not hasattr(request, '_cached_app_user'):
+        user = None
+        session = getattr(request, 'session', None)
+        if session is not None and session.get('is_authenticated', False):
+            user_id = session.get('user_id')
+            if user_id:
+                user = user_cache.get(user_id)
+        request._cached_app_user = user
+    return request._cached_app_user
+
+
+class AppUserMiddleware:
+    """Sets a lazy ``request.app_user`` (use get_app_user() for ``is None`` checks).
+
+    Must come after SessionMiddleware. Async-capable so async views under
+    ASGI are not pushed through a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.app_user = SimpleLazyObject(lambda: get_app_user(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.app_user = SimpleLazyObject(lambda: get_app_user(request))
+        return await self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """Records latency, query count, DB time and response size per route.
+
+    Routes are the URL pattern (``attendance_api/students/list/``), not the
+    raw path, so IDs in query strings don't multiply the series. Requests
+    that run more than METRICS_QUERY_BUDGET queries are logged as warnings.
+    Queries made while a streamed response is consumed are not counted.
+    Put it first so the time spent in every other middleware is included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token = start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        self._observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats, token = start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        self._observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def _observe(self, request, response, stats, duration):
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match is not None else UNMATCHED_ROUTE
+        over_budget = stats.queries > METRICS_QUERY_BUDGET
+        if over_budget:
+            logger.warning(
+                '%s %s ran %d queries (budget %d, %.1f ms in the database)',
+                request.method, route, stats.queries, METRICS_QUERY_BUDGET, stats.db_time * 1000,
+            )
+        request_metrics.observe(
+            route,
+            request.method,
+            response.status_code,
+            duration,
+            stats.queries,
+            stats.db_time,
+            size=None if response.streaming else len(response.content),
+            over_budget=over_budget,
+        )
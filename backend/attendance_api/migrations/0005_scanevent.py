@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance_api', '0004_user_alter_device_lastseen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScanEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag_uid', models.CharField(max_length=100)),
+                ('timestamp', models.DateTimeField()),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scan_events', to='attendance_api.device')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['device', 'timestamp'], name='attendance__device__4edffd_idx'), models.Index(fields=['tag_uid', 'timestamp'], name='attendance__tag_uid_89b68f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance_api', '0005_scanevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanevent',
+            name='student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scan_events', to='attendance_api.student'),
+        ),
+        migrations.AddField(
+            model_name='scanevent',
+            name='teacher',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scan_events', to='attendance_api.teacher'),
+        ),
+        migrations.CreateModel(
+            name='Credential',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('rfid', 'RFID'), ('fingerprint', 'Fingerprint')], max_length=20)),
+                ('uid', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('student', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='credentials', to='attendance_api.student')),
+                ('teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='credentials', to='attendance_api.teacher')),
+            ],
+            options={
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('student__isnull', False), ('teacher__isnull', True)), models.Q(('student__isnull', True), ('teacher__isnull', False)), _connector='OR'), name='credential_single_owner'), models.UniqueConstraint(condition=models.Q(('student__isnull', False)), fields=('student', 'type'), name='credential_unique_student_type'), models.UniqueConstraint(condition=models.Q(('teacher__isnull', False)), fields=('teacher', 'type'), name='credential_unique_teacher_type')],
+            },
+        ),
+    ]
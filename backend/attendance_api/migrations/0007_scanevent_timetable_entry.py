@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance_api', '0006_credential'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanevent',
+            name='timetable_entry',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scan_events', to='attendance_api.timetableentry'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-18 07:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance_api', '0007_scanevent_timetable_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('present', 'Present'), ('late', 'Late')], max_length=10)),
+                ('scan_count', models.PositiveIntegerField(default=0)),
+                ('first_scan_at', models.DateTimeField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='attendance_api.course')),
+                ('student', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='attendance_api.student')),
+                ('teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='attendance_api.teacher')),
+                ('timetable_entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='attendance_api.timetableentry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'date'], name='attendance__student_34eb26_idx'), models.Index(fields=['teacher', 'date'], name='attendance__teacher_33710f_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('student__isnull', False)), fields=('date', 'timetable_entry', 'student'), name='attendance_rollup_unique_student'), models.UniqueConstraint(condition=models.Q(('teacher__isnull', False)), fields=('date', 'timetable_entry', 'teacher'), name='attendance_rollup_unique_teacher')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SessionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('year', models.IntegerField()),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('late_count', models.PositiveIntegerField(default=0)),
+                ('teacher_present', models.BooleanField(default=False)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_rollups', to='attendance_api.course')),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_rollups', to='attendance_api.program')),
+                ('timetable_entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_rollups', to='attendance_api.timetableentry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['program', 'date'], name='attendance__program_d6f14b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'timetable_entry'), name='session_rollup_unique_session')],
+            },
+        ),
+    ]
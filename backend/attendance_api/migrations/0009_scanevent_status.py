@@ -0,0 +1,47 @@
+# Generated by Django 6.0.2 on 2026-10-18 07:09
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def classify_existing_scans(apps, schema_editor):
+    ScanEvent = apps.get_model('attendance_api', 'ScanEvent')
+    grace = timedelta(minutes=getattr(settings, 'ATTENDANCE_GRACE_MINUTES', 10))
+    scans = (
+        ScanEvent.objects.filter(timetable_entry__isnull=False)
+        .select_related('timetable_entry')
+        .only('id', 'timestamp', 'timetable_entry__startTime')
+    )
+    batch = []
+    for scan in scans.iterator(chunk_size=2000):
+        local = timezone.localtime(scan.timestamp)
+        cutoff = datetime.combine(local.date(), scan.timetable_entry.startTime) + grace
+        scan.status = 'late' if local.replace(tzinfo=None) > cutoff else 'present'
+        batch.append(scan)
+        if len(batch) >= 2000:
+            ScanEvent.objects.bulk_update(batch, ['status'])
+            batch = []
+    ScanEvent.objects.bulk_update(batch, ['status'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance_api', '0008_attendance_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanevent',
+            name='status',
+            field=models.CharField(choices=[('present', 'Present'), ('late', 'Late'), ('out_of_session', 'Out of session')], default='out_of_session', max_length=20),
+        ),
+        migrations.RunPython(classify_existing_scans, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='scanevent',
+            index=models.Index(fields=['status', 'timestamp'], name='attendance__status_91279f_idx'),
+        ),
+    ]
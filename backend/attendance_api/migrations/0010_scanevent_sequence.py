@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance_api', '0009_scanevent_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanevent',
+            name='sequence',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='scanevent',
+            constraint=models.UniqueConstraint(condition=models.Q(('sequence__isnull', False)), fields=('device', 'sequence'), name='scan_event_unique_device_sequence'),
+        ),
+    ]
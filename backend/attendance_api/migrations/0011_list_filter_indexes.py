@@ -0,0 +1,84 @@
+# Generated by Django 6.0.2 on 2026-10-18 07:17
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+TRIGRAM_INDEXES = [
+    ('attendance_timetable_location_trgm', 'location_lc'),
+    ('attendance_timetable_qualification_trgm', 'qualification_lc'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # icontains is LIKE '%...%', which only a trigram index can serve;
+    # other backends keep the plain B-tree indexes
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model('attendance_api', 'TimetableEntry')._meta.db_table
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance_api', '0010_scanevent_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='program_lc',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Lower('program'), output_field=models.CharField(max_length=100)),
+        ),
+        migrations.AddField(
+            model_name='timetableentry',
+            name='location_lc',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('location')), output_field=models.CharField(max_length=200)),
+        ),
+        migrations.AddField(
+            model_name='timetableentry',
+            name='qualification_lc',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Lower('qualification'), output_field=models.CharField(max_length=100)),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['program_lc', 'year'], name='attendance__program_49a4dd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetableentry',
+            index=models.Index(fields=['program', 'year', 'day'], name='attendance__program_fffdf4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetableentry',
+            index=models.Index(fields=['device', 'day', 'startTime'], name='attendance__device__47ac10_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetableentry',
+            index=models.Index(fields=['teacher', 'day', 'startTime'], name='attendance__teacher_3872b0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetableentry',
+            index=models.Index(fields=['day', 'location_lc'], name='attendance__day_869857_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetableentry',
+            index=models.Index(fields=['year', 'day'], name='attendance__year_57c864_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scanevent',
+            index=models.Index(fields=['timestamp'], name='attendance__timesta_1ed2d9_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
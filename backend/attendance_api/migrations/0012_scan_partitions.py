@@ -0,0 +1,60 @@
+# Generated by Django 6.0.2 on 2026-10-18 07:22
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def assign_periods(apps, schema_editor):
+    ScanEvent = apps.get_model('attendance_api', 'ScanEvent')
+    batch = []
+    for scan in ScanEvent.objects.only('id', 'timestamp').iterator(chunk_size=2000):
+        local = timezone.localtime(scan.timestamp)
+        scan.period = local.year * 100 + local.month
+        batch.append(scan)
+        if len(batch) >= 2000:
+            ScanEvent.objects.bulk_update(batch, ['period'])
+            batch = []
+    ScanEvent.objects.bulk_update(batch, ['period'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance_api', '0011_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.PositiveIntegerField()),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('row_count', models.PositiveIntegerField()),
+                ('first_id', models.PositiveBigIntegerField()),
+                ('last_id', models.PositiveBigIntegerField()),
+                ('size_bytes', models.PositiveBigIntegerField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='scanevent',
+            name='period',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunPython(assign_periods, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='scanevent',
+            name='period',
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AddIndex(
+            model_name='scanevent',
+            index=models.Index(fields=['period', 'timestamp'], name='attendance__period_140abf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpartition',
+            index=models.Index(fields=['period'], name='attendance__period_f7cb23_idx'),
+        ),
+    ]
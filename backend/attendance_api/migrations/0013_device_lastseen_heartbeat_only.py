@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance_api', '0012_scan_partitions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='device',
+            name='lastSeen',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
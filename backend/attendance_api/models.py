@@ -1,5 +1,6 @@
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Lower, Trim
 from django.contrib.auth.hashers import make_password, check_password
 import uuid
 
@@ -39,7 +40,13 @@ class User(models.Model):
         self.password = make_password(raw_password)
 
     def check_password(self, raw_password):
-        return check_password(raw_password, self.password)
+        def setter(raw_password):
+            # Stored hash predates the current PASSWORD_HASHER policy
+            self.set_password(raw_password)
+            if self.pk is not None:
+                User.objects.filter(pk=self.pk).update(password=self.password)
+
+        return check_password(raw_password, self.password, setter)
 
     def get_role_display_name(self):
         return dict(self.USER_ROLES).get(self.role, 'Unknown')
@@ -69,12 +76,23 @@ class Student(models.Model):
     name = models.CharField(max_length=200)
     regNumber = models.CharField(max_length=50, unique=True)  # Note the capital N to match your Dart code
     program = models.CharField(max_length=100)
+    # Maintained by the database; report queries match programs case-insensitively on it
+    program_lc = models.GeneratedField(
+        expression=Lower('program'),
+        output_field=models.CharField(max_length=100),
+        db_persist=True,
+    )
     year = models.IntegerField()
     hasRfid = models.BooleanField(default=False)
     hasFingerprint = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['program_lc', 'year']),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.regNumber})"
 
@@ -107,7 +125,9 @@ class Device(models.Model):
         choices=DeviceType.choices
     )
     location = models.CharField(max_length=150)
-    lastSeen = models.DateTimeField(auto_now=True)
+    # Latest heartbeat or scan, written back by device_heartbeat; null until
+    # the device first reports (editing the device must not make it look alive)
+    lastSeen = models.DateTimeField(null=True, blank=True)
     status = models.CharField(
         max_length=20,
         choices=DeviceStatus.choices,
@@ -219,6 +239,263 @@ class TimetableEntry(models.Model):
     qualification = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Normalized copies kept by the database for case-insensitive filters and
+    # room clash checks (trigram-indexed on PostgreSQL, see migration 0011)
+    location_lc = models.GeneratedField(
+        expression=Lower(Trim('location')),
+        output_field=models.CharField(max_length=200),
+        db_persist=True,
+    )
+    qualification_lc = models.GeneratedField(
+        expression=Lower('qualification'),
+        output_field=models.CharField(max_length=100),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['program', 'year', 'day']),
+            models.Index(fields=['device', 'day', 'startTime']),
+            models.Index(fields=['teacher', 'day', 'startTime']),
+            models.Index(fields=['day', 'location_lc']),
+            models.Index(fields=['year', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.program} - {self.course} ({self.day} {self.start_time})"
+
+
+class Credential(models.Model):
+    class CredentialType(models.TextChoices):
+        RFID = 'rfid', 'RFID'
+        FINGERPRINT = 'fingerprint', 'Fingerprint'
+
+    type = models.CharField(
+        max_length=20,
+        choices=CredentialType.choices
+    )
+    # RFID tag UID or fingerprint template ID as reported by the reader
+    uid = models.CharField(max_length=100, unique=True)
+    student = models.ForeignKey(
+        'Student',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='credentials'
+    )
+    teacher = models.ForeignKey(
+        'Teacher',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='credentials'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(student__isnull=False, teacher__isnull=True) |
+                    models.Q(student__isnull=True, teacher__isnull=False)
+                ),
+                name='credential_single_owner',
+            ),
+            models.UniqueConstraint(
+                fields=['student', 'type'],
+                condition=models.Q(student__isnull=False),
+                name='credential_unique_student_type',
+            ),
+            models.UniqueConstraint(
+                fields=['teacher', 'type'],
+                condition=models.Q(teacher__isnull=False),
+                name='credential_unique_teacher_type',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.type}:{self.uid}"
+
+
+class ScanEvent(models.Model):
+    class ScanStatus(models.TextChoices):
+        PRESENT = 'present', 'Present'
+        LATE = 'late', 'Late'
+        OUT_OF_SESSION = 'out_of_session', 'Out of session'
+
+    device = models.ForeignKey(
+        'Device',
+        on_delete=models.CASCADE,
+        related_name='scan_events'
+    )
+    tag_uid = models.CharField(max_length=100)
+    timestamp = models.DateTimeField()
+    student = models.ForeignKey(
+        'Student',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='scan_events'
+    )
+    teacher = models.ForeignKey(
+        'Teacher',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='scan_events'
+    )
+    timetable_entry = models.ForeignKey(
+        'TimetableEntry',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='scan_events'
+    )
+    # Per-device counter assigned by the reader; (device, sequence) is the
+    # idempotency key that makes buffered backlogs safe to resend
+    sequence = models.PositiveBigIntegerField(null=True, blank=True)
+    # Classified at ingest against the matched session's start time
+    status = models.CharField(
+        max_length=20,
+        choices=ScanStatus.choices,
+        default=ScanStatus.OUT_OF_SESSION
+    )
+    # Local month of ``timestamp`` as YYYYMM: the partition key that
+    # time-bounded queries prune on and archive_scans moves out as a unit
+    period = models.PositiveIntegerField()
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['period', 'timestamp']),
+            models.Index(fields=['device', 'timestamp']),
+            models.Index(fields=['tag_uid', 'timestamp']),
+            models.Index(fields=['status', 'timestamp']),
+            models.Index(fields=['timestamp']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['device', 'sequence'],
+                condition=models.Q(sequence__isnull=False),
+                name='scan_event_unique_device_sequence',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tag_uid} @ {self.device_id} ({self.timestamp})"
+
+
+class ArchivedPartition(models.Model):
+    """A month of scan events moved out of the table into a gzipped NDJSON file."""
+    period = models.PositiveIntegerField()
+    path = models.CharField(max_length=500, unique=True)
+    row_count = models.PositiveIntegerField()
+    first_id = models.PositiveBigIntegerField()
+    last_id = models.PositiveBigIntegerField()
+    size_bytes = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['period']),
+        ]
+
+    def __str__(self):
+        return f"{self.period}: {self.row_count} scans in {self.path}"
+
+
+class AttendanceStatus(models.TextChoices):
+    PRESENT = 'present', 'Present'
+    LATE = 'late', 'Late'
+
+
+class AttendanceRollup(models.Model):
+    """One row per person per timetable session per day, maintained at ingest."""
+    date = models.DateField()
+    timetable_entry = models.ForeignKey(
+        'TimetableEntry',
+        on_delete=models.CASCADE,
+        related_name='attendance_rollups'
+    )
+    course = models.ForeignKey(
+        'Course',
+        on_delete=models.CASCADE,
+        related_name='attendance_rollups'
+    )
+    student = models.ForeignKey(
+        'Student',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups'
+    )
+    teacher = models.ForeignKey(
+        'Teacher',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups'
+    )
+    status = models.CharField(max_length=10, choices=AttendanceStatus.choices)
+    scan_count = models.PositiveIntegerField(default=0)
+    first_scan_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'timetable_entry', 'student'],
+                condition=models.Q(student__isnull=False),
+                name='attendance_rollup_unique_student',
+            ),
+            models.UniqueConstraint(
+                fields=['date', 'timetable_entry', 'teacher'],
+                condition=models.Q(teacher__isnull=False),
+                name='attendance_rollup_unique_teacher',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['student', 'date']),
+            models.Index(fields=['teacher', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.timetable_entry_id}: {self.student_id or self.teacher_id} {self.status}"
+
+
+class SessionRollup(models.Model):
+    """Per-session daily totals, so program reports never touch per-person rows."""
+    date = models.DateField()
+    timetable_entry = models.ForeignKey(
+        'TimetableEntry',
+        on_delete=models.CASCADE,
+        related_name='session_rollups'
+    )
+    program = models.ForeignKey(
+        'Program',
+        on_delete=models.CASCADE,
+        related_name='session_rollups'
+    )
+    course = models.ForeignKey(
+        'Course',
+        on_delete=models.CASCADE,
+        related_name='session_rollups'
+    )
+    year = models.IntegerField()
+    present_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    teacher_present = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'timetable_entry'],
+                name='session_rollup_unique_session',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['program', 'date']),
+        ]
 
     def __str__(self):
-        return f"{self.program} - {self.course} ({self.day} {self.start_time})"
\ No newline at end of file
+        return f"{self.date} {self.timetable_entry_id}: {self.present_count}+{self.late_count}"
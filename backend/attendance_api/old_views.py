@@ -1,4 +1,6 @@
 from django.core.serializers import serialize
+from django.db import transaction
+from django.db.models import F
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -6,8 +8,15 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from .models import Student, Teacher, Device, Program, Course, TimetableEntry
 from .serializers import StudentSerializer, TeacherSerializer, DeviceSerializer, ProgramSerializer, \
-    CourseSerializer, TimetableEntrySerializer
+    CourseSerializer, TimetableEntrySerializer, courses_with_programs
 from .views.auth_views import LoginView, GetCurrentUserView, LogoutView
+from .device_heartbeat import heartbeat_tracker
+from .stats_cache import stats_cache
+from .timetable_index import timetable_index
+from .timetable_conflicts import find_conflicts, check_conflicts, candidate_from_data, ENTRY_COLUMNS
+from .pagination import list_response, is_paginated
+from .fast_serializers import FastStudentSerializer, FastTeacherSerializer, FastProgramSerializer, \
+    FastTimetableEntrySerializer
 
 
 # Create a base class that explicitly disables CSRF
@@ -73,12 +82,8 @@ class BulkDeleteBaseView(CsrfExemptAPIView):
 class StudentListView(CsrfExemptAPIView):
     def get(self, request):
         try:
-            students = Student.objects.all()
-            serializer = StudentSerializer(students, many=True)
-            return Response({
-                'status': 'success',
-                'data': serializer.data
-            })
+            return list_response(request, Student.objects.all(), StudentSerializer,
+                                 fast_serializer=FastStudentSerializer)
         except Exception as e:
             return Response({
                 'status': 'error',
@@ -172,12 +177,8 @@ class DeleteStudentView(DeleteBaseView):
 class TeacherListView(CsrfExemptAPIView):
     def get(self, request):
         try:
-            teachers = Teacher.objects.all()
-            serializer = TeacherSerializer(teachers, many=True)
-            return Response({
-                'status': 'success',
-                'data': serializer.data
-            })
+            return list_response(request, Teacher.objects.all(), TeacherSerializer,
+                                 fast_serializer=FastTeacherSerializer)
         except Exception as e:
             return Response({
                 'status': 'error',
@@ -267,12 +268,24 @@ class DeleteTeacherView(DeleteBaseView):
 
 class DeviceListView(CsrfExemptAPIView):
     def get(self, request):
-        devices = Device.objects.all().order_by('-lastSeen')
-        serializer = DeviceSerializer(devices, many=True)
-        return Response({
-            'status': 'success',
-            'data': serializer.data
-        })
+        heartbeat_tracker.maybe_flush()
+
+        def with_live_status(devices):
+            devices = heartbeat_tracker.apply(devices)
+            if not is_paginated(request):
+                # Most recently seen first; devices that never reported go last
+                devices.sort(
+                    key=lambda device: (device.lastSeen is not None, device.lastSeen or 0), reverse=True
+                )
+            return devices
+
+        return list_response(
+            request,
+            Device.objects.all().order_by(F('lastSeen').desc(nulls_last=True)),
+            DeviceSerializer,
+            required=('lastSeen', 'status'),
+            prepare=with_live_status,
+        )
 
 class CreateDeviceView(CsrfExemptAPIView):
     def post(self, request):
@@ -351,13 +364,8 @@ class CreateProgramView(CsrfExemptAPIView):
 
 class ProgramListView(CsrfExemptAPIView):
     def get(self, request):
-        programs = Program.objects.all()
-        serializer = ProgramSerializer(programs, many=True)
-
-        return Response({
-            'status': 'success',
-            'data': serializer.data
-        })
+        return list_response(request, Program.objects.all(), ProgramSerializer,
+                             fast_serializer=FastProgramSerializer)
 
 class UpdateProgramView(CsrfExemptAPIView):
     def post(self, request):
@@ -406,13 +414,13 @@ class DeleteProgramView(DeleteBaseView):
 
 class CourseListView(CsrfExemptAPIView):
     def get(self, request):
-        courses = Course.objects.prefetch_related('programs').all()
-        serializer = CourseSerializer(courses, many=True)
-
-        return Response({
-            'status': 'success',
-            'data': serializer.data
-        })
+        courses = courses_with_programs()
+        return list_response(
+            request,
+            courses,
+            CourseSerializer,
+            columns={'programs': [], 'program_abbreviations': []},
+        )
 
 class CreateCourseView(CsrfExemptAPIView):
     def post(self, request):
@@ -475,41 +483,46 @@ class DeleteCourseView(DeleteBaseView):
     model = Course
     model_name = "Course"
 
-class TimetableEntryListView(CsrfExemptAPIView):
-    def get(self, request):
-        queryset = TimetableEntry.objects.all().select_related(
-            'program', 'course', 'teacher', 'device'
-        )
+def filter_timetable_entries(queryset, params):
+    program = params.get('program')
+    if program:
+        queryset = queryset.filter(program__id=program)
 
-        program = request.query_params.get('program')
-        if program:
-            queryset = queryset.filter(program__id=program)
+    year = params.get('year')
+    if year:
+        queryset = queryset.filter(year=year)
 
-        year = request.query_params.get('year')
-        if year:
-            queryset = queryset.filter(year=year)
+    teacher = params.get('teacher')
+    if teacher:
+        queryset = queryset.filter(teacher__id=teacher)
 
-        teacher = request.query_params.get('teacher')
-        if teacher:
-            queryset = queryset.filter(teacher__id=teacher)
+    location = params.get('location')
+    if location:
+        queryset = queryset.filter(location_lc__contains=location.strip().lower())
 
-        location = request.query_params.get('location')
-        if location:
-            queryset = queryset.filter(location_icontains=location)
+    day = params.get('day')
+    if day:
+        queryset = queryset.filter(day=day)
 
-        day = request.query_params.get('day')
-        if day:
-            queryset = queryset.filter(day=day)
+    qualification = params.get('qualification')
+    if qualification:
+        queryset = queryset.filter(qualification_lc__contains=qualification.lower())
 
-        qualification = request.query_params.get('qualification')
-        if qualification:
-            queryset = queryset.filter(qualification__icontains=qualification)
+    return queryset
 
-        serializer = TimetableEntrySerializer(queryset, many=True)
-        return Response({
-            'status': 'success',
-            'data': serializer.data
-        })
+class TimetableEntryListView(CsrfExemptAPIView):
+    def get(self, request):
+        queryset = TimetableEntry.objects.all().select_related(
+            'program', 'course', 'teacher', 'device'
+        )
+        queryset = filter_timetable_entries(queryset, request.query_params)
+
+        return list_response(
+            request,
+            queryset,
+            TimetableEntrySerializer,
+            fast_serializer=FastTimetableEntrySerializer,
+        )
 
 class CreateTimetableEntryView(CsrfExemptAPIView):
     def post(self, request):
@@ -525,6 +538,13 @@ class CreateTimetableEntryView(CsrfExemptAPIView):
             'message': serializer.errors
         }, status=400)
 
+TIMETABLE_RELATED_FIELDS = {
+    'program': Program,
+    'course': Course,
+    'teacher': Teacher,
+    'device': Device,
+}
+
 class BulkCreateTimetableEntryView(CsrfExemptAPIView):
     def post(self, request):
         if not isinstance(request.data, list):
@@ -533,18 +553,67 @@ class BulkCreateTimetableEntryView(CsrfExemptAPIView):
                 'message': 'Expected a list of timetable entries.'
             }, status=400)
 
-        serializer = TimetableEntrySerializer(data=request.data, many=True)
+        # One in_bulk() per related model instead of a lookup per item and field
+        preloaded = {}
+        for field, model in TIMETABLE_RELATED_FIELDS.items():
+            ids = set()
+            for item in request.data:
+                if isinstance(item, dict) and not isinstance(item.get(field), bool):
+                    try:
+                        ids.add(int(item.get(field)))
+                    except (TypeError, ValueError):
+                        pass
+            preloaded[model] = model.objects.in_bulk(ids) if ids else {}
+
+        serializer = TimetableEntrySerializer(
+            data=request.data, many=True,
+            context={'preloaded': preloaded, 'skip_conflict_check': True}
+        )
         if serializer.is_valid():
-            entries = serializer.save()
+            conflicts = check_conflicts([
+                candidate_from_data(item, f'new-{index}')
+                for index, item in enumerate(serializer.validated_data)
+            ])
+            if conflicts:
+                return Response({
+                    'status': 'error',
+                    'message': {'conflicts': conflicts}
+                }, status=400)
+
+            with transaction.atomic():
+                entries = TimetableEntry.objects.bulk_create(
+                    [TimetableEntry(**item) for item in serializer.validated_data]
+                )
+                # bulk_create skips post_save, so announce the change by hand
+                timetable_index.changed()
+
+            created = TimetableEntry.objects.filter(
+                id__in=[entry.id for entry in entries]
+            ).select_related('program', 'course', 'teacher', 'device').order_by('id')
             return Response({
                 'status': 'success',
-                'data': TimetableEntrySerializer(entries, many=True).data
+                'data': TimetableEntrySerializer(created, many=True).data
             }, status=201)
         return Response({
             'status': 'error',
             'message': serializer.errors
         }, status=400)
 
+class ValidateTimetableView(CsrfExemptAPIView):
+    """Reports every teacher/device/location double-booking in the (optionally filtered) timetable."""
+
+    def get(self, request):
+        queryset = filter_timetable_entries(TimetableEntry.objects.all(), request.query_params)
+        conflicts = find_conflicts(queryset.values(*ENTRY_COLUMNS))
+
+        return Response({
+            'status': 'success',
+            'data': {
+                'count': len(conflicts),
+                'conflicts': conflicts
+            }
+        })
+
 class UpdateTimetableEntryView(CsrfExemptAPIView):
     def post(self, request):
         entry_id = request.data.get('id')
@@ -583,20 +652,9 @@ class BulkDeleteTimetableEntryView(BulkDeleteBaseView):
 
 class StatsView(CsrfExemptAPIView):
     def get(self, request):
-        students = Student.objects.count()
-        teachers = Teacher.objects.count()
-        programs = Program.objects.count()
-        courses = Course.objects.count()
-
-        active_devices = Device.objects.filter(status=Device.DeviceStatus.ONLINE).count()
+        heartbeat_tracker.maybe_flush()
 
         return Response({
             "status": "success",
-            "data": {
-                "students": students,
-                "teachers": teachers,
-                "programs": programs,
-                "courses": courses,
-                "active_devices": active_devices
-            }
+            "data": stats_cache.snapshot()
         })
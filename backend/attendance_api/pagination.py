@@ -0,0 +1,130 @@
+import base64
+import binascii
+from operator import attrgetter
+
+from django.conf import settings
+from rest_framework.response import Response
+
+LIST_PAGE_SIZE = getattr(settings, 'LIST_PAGE_SIZE', 100)
+LIST_MAX_PAGE_SIZE = getattr(settings, 'LIST_MAX_PAGE_SIZE', 1000)
+
+
+class ListParamError(ValueError):
+    pass
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ListParamError('Invalid cursor')
+
+
+def requested_fields(request, serializer_class):
+    """Parse ``?fields=a,b`` into serializer field names, in serializer order."""
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+
+    wanted = {name.strip() for name in raw.split(',') if name.strip()}
+    readable = [name for name, field in serializer_class().fields.items() if not field.write_only]
+    unknown = wanted.difference(readable)
+    if unknown:
+        raise ListParamError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return [name for name in readable if name in wanted]
+
+
+def project(queryset, fields, columns=None, required=()):
+    """Push a field projection down into the SELECT with only().
+
+    ``columns`` maps serializer fields that are not plain model columns to the
+    lookups they need (an empty list for many-to-many/prefetched data).
+    """
+    if fields is None:
+        return queryset
+    columns = columns or {}
+    selected = {'id', *required}
+    for name in fields:
+        selected.update(columns.get(name, [name]))
+
+    # select_related() on a relation that only() defers is an error, so keep
+    # just the joins the projection still needs.
+    if queryset.query.select_related:
+        related = {lookup.split('__', 1)[0] for lookup in selected if '__' in lookup}
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+    return queryset.only(*selected)
+
+
+def is_paginated(request):
+    return 'limit' in request.query_params or 'cursor' in request.query_params
+
+
+def paginate(request, queryset, row_id=attrgetter('id')):
+    """Keyset pagination on ``id``.
+
+    Only applies when the client sends ``limit`` or ``cursor`` so existing
+    callers that expect the whole list keep working. Returns (rows, next_cursor).
+    """
+    if not is_paginated(request):
+        return queryset, None
+
+    params = request.query_params
+    try:
+        limit = int(params.get('limit', LIST_PAGE_SIZE))
+    except ValueError:
+        raise ListParamError('limit must be an integer')
+    if limit < 1:
+        raise ListParamError('limit must be positive')
+    limit = min(limit, LIST_MAX_PAGE_SIZE)
+
+    queryset = queryset.order_by('id')
+    cursor = params.get('cursor')
+    if cursor:
+        queryset = queryset.filter(id__gt=decode_cursor(cursor))
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = encode_cursor(row_id(rows[limit - 1])) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def list_response(request, queryset, serializer_class, columns=None, required=(), prepare=None,
+                  fast_serializer=None):
+    """Build the standard list payload with optional ?fields= projection and cursor paging.
+
+    With ``fast_serializer`` the rows are read with values_list() and never
+    become model instances; ``columns``/``required``/``prepare`` apply to the
+    DRF path only.
+    """
+    try:
+        fields = requested_fields(request, serializer_class)
+        if fast_serializer is not None:
+            fast = fast_serializer(fields)
+            rows, next_cursor = paginate(request, fast.rows(queryset), row_id=fast.row_id)
+        else:
+            rows, next_cursor = paginate(request, project(queryset, fields, columns, required))
+    except ListParamError as e:
+        return Response({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+
+    if fast_serializer is not None:
+        data = fast.to_data(rows)
+    else:
+        if prepare is not None:
+            rows = prepare(rows)
+        data = serializer_class(rows, many=True, fields=fields).data
+
+    payload = {
+        'status': 'success',
+        'data': data
+    }
+    if is_paginated(request):
+        payload['next_cursor'] = next_cursor
+    return Response(payload)
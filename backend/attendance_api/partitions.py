@@ -0,0 +1,142 @@
+import gzip
+import hashlib
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from .fast_serializers import FastScanEventSerializer
+from .models import ArchivedPartition, ScanEvent
+
+# Scan events are partitioned by local calendar month (``period`` = YYYYMM).
+# Time-bounded queries go through prune_periods() so they only touch the
+# months they cover, and archive_scans moves closed months out of the table.
+
+SCAN_ARCHIVE_RETAIN_MONTHS = getattr(settings, 'SCAN_ARCHIVE_RETAIN_MONTHS', 6)
+SCAN_ARCHIVE_DIR = getattr(settings, 'SCAN_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archive'))
+ARCHIVE_CHUNK_SIZE = 5000
+
+
+def period_of(moment, tz=None):
+    """YYYYMM of an aware datetime in local time (or ``tz``)."""
+    local = timezone.localtime(moment, tz)
+    return local.year * 100 + local.month
+
+
+def shift_period(period, months):
+    index = (period // 100) * 12 + period % 100 - 1 + months
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def prune_periods(queryset, start=None, end=None):
+    """Restrict a ScanEvent queryset to the periods overlapping [start, end)."""
+    if start is not None:
+        queryset = queryset.filter(period__gte=period_of(start))
+    if end is not None:
+        queryset = queryset.filter(period__lte=period_of(end))
+    return queryset
+
+
+def archive_cutoff(retain_months=SCAN_ARCHIVE_RETAIN_MONTHS):
+    """First period that is kept live; everything before it may be archived."""
+    return shift_period(period_of(timezone.now()), -retain_months)
+
+
+def partition_summary():
+    """Live periods with their row counts and id range, plus the archived files."""
+    live = list(
+        ScanEvent.objects.values('period')
+        .annotate(rows=Count('id'), first_id=Min('id'), last_id=Max('id'))
+        .order_by('period')
+    )
+    archived = (
+        ArchivedPartition.objects.values('period')
+        .annotate(rows=Sum('row_count'), files=Count('id'), size_bytes=Sum('size_bytes'))
+        .order_by('period')
+    )
+    return {
+        'archive_before': archive_cutoff(),
+        'live': live,
+        'archived': list(archived),
+    }
+
+
+def archivable_periods(cutoff):
+    return list(
+        ScanEvent.objects.filter(period__lt=cutoff)
+        .values_list('period', flat=True).distinct().order_by('period')
+    )
+
+
+def _delete_range(period, first_id, last_id, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """Delete a period's archived id range in short transactions; returns rows deleted."""
+    deleted = 0
+    rows = ScanEvent.objects.filter(period=period, id__gte=first_id, id__lte=last_id)
+    while True:
+        ids = list(rows.order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            deleted += ScanEvent.objects.filter(id__in=ids).delete()[0]
+
+
+def _write_ndjson(path, queryset, chunk_size=ARCHIVE_CHUNK_SIZE):
+    fast = FastScanEventSerializer()
+    rows = fast.rows(queryset).iterator(chunk_size=chunk_size)
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as handle:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            handle.write(''.join(
+                json.dumps(item, separators=(',', ':')) + '\n' for item in fast.to_data(chunk)
+            ))
+            count += len(chunk)
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return count, digest.hexdigest()
+
+
+def archive_period(period, directory=SCAN_ARCHIVE_DIR):
+    """Move one period's scans to ``scans-<period>-<first>-<last>.ndjson.gz`` and delete them.
+
+    Rows are exported up to the highest id present when the run starts, so
+    late backlogs for the same month stay live for the next run. The file is
+    recorded before anything is deleted, and a rerun first finishes deleting
+    ranges already recorded, so an interrupted archive never loses or
+    duplicates rows. Returns the new ArchivedPartition, or None if nothing
+    was left to archive.
+    """
+    for first_id, last_id in ArchivedPartition.objects.filter(period=period).values_list('first_id', 'last_id'):
+        _delete_range(period, first_id, last_id)
+
+    bounds = ScanEvent.objects.filter(period=period).aggregate(first_id=Min('id'), last_id=Max('id'))
+    if bounds['first_id'] is None:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"scans-{period}-{bounds['first_id']}-{bounds['last_id']}.ndjson.gz")
+    queryset = ScanEvent.objects.filter(
+        period=period, id__lte=bounds['last_id']
+    ).order_by('id')
+    row_count, sha256 = _write_ndjson(path + '.tmp', queryset)
+    os.replace(path + '.tmp', path)
+
+    partition = ArchivedPartition.objects.create(
+        period=period,
+        path=path,
+        row_count=row_count,
+        size_bytes=os.path.getsize(path),
+        sha256=sha256,
+        **bounds,
+    )
+    _delete_range(period, bounds['first_id'], bounds['last_id'])
+    return partition
@@ -0,0 +1,128 @@
+from collections import defaultdict
+
+from django.db.models import Count, Q, Sum
+
+from .models import AttendanceRollup, AttendanceStatus, Course, Program, SessionRollup, Student
+
+# Reports read only the rollup tables (see rollups.py). A session counts as
+# held once anyone scanned into it on that date.
+
+
+def _rate(attended, expected):
+    return round(100.0 * attended / expected, 1) if expected else None
+
+
+def _course_names(course_ids):
+    return {
+        pk: {'id': pk, 'name': name, 'code': code}
+        for pk, name, code in Course.objects.filter(id__in=course_ids).values_list('id', 'name', 'code')
+    }
+
+
+def program_for_student(student):
+    """Students store their program as free text: match it to an abbreviation or name."""
+    label = (student.program or '').strip()
+    return (
+        Program.objects.filter(abbreviation__iexact=label).first()
+        or Program.objects.filter(name__iexact=label).first()
+    )
+
+
+def _enrolled_by_year(program):
+    labels = {program.abbreviation.lower(), program.name.lower()}
+    rows = (
+        Student.objects.filter(program_lc__in=labels)
+        .values('year')
+        .annotate(count=Count('id'))
+    )
+    return {row['year']: row['count'] for row in rows}
+
+
+def program_report(program, start, end, year=None):
+    """Per-course attendance for ``program`` between ``start`` and ``end`` (inclusive dates)."""
+    sessions = SessionRollup.objects.filter(program=program, date__gte=start, date__lte=end)
+    if year is not None:
+        sessions = sessions.filter(year=year)
+    rows = sessions.values('course_id', 'year').annotate(
+        sessions=Count('id'),
+        present=Sum('present_count'),
+        late=Sum('late_count'),
+        taught=Count('id', filter=Q(teacher_present=True)),
+    )
+
+    enrolled = _enrolled_by_year(program)
+    courses = defaultdict(lambda: {'sessions': 0, 'present': 0, 'late': 0, 'taught': 0, 'expected': 0})
+    for row in rows:
+        course = courses[row['course_id']]
+        for key in ('sessions', 'present', 'late', 'taught'):
+            course[key] += row[key]
+        course['expected'] += row['sessions'] * enrolled.get(row['year'], 0)
+
+    names = _course_names(courses)
+    data = []
+    for course_id, course in courses.items():
+        attended = course['present'] + course['late']
+        data.append({
+            'course': names.get(course_id, {'id': course_id}),
+            'sessions_held': course['sessions'],
+            'sessions_with_teacher': course['taught'],
+            'present': course['present'],
+            'late': course['late'],
+            'attendance_rate': _rate(attended, course['expected']),
+            'late_rate': _rate(course['late'], attended),
+        })
+    data.sort(key=lambda item: item['course'].get('name') or '')
+
+    return {
+        'program': {'id': program.id, 'name': program.name, 'abbreviation': program.abbreviation},
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'enrolled': enrolled if year is None else {year: enrolled.get(year, 0)},
+        'courses': data,
+    }
+
+
+def student_report(student, start, end):
+    """Per-course sessions attended, late and missed by ``student``."""
+    attended = {
+        row['course_id']: row
+        for row in AttendanceRollup.objects.filter(
+            student=student, date__gte=start, date__lte=end
+        ).values('course_id').annotate(
+            present=Count('id', filter=Q(status=AttendanceStatus.PRESENT)),
+            late=Count('id', filter=Q(status=AttendanceStatus.LATE)),
+        )
+    }
+
+    held = {}
+    program = program_for_student(student)
+    if program is not None:
+        held = dict(
+            SessionRollup.objects.filter(
+                program=program, year=student.year, date__gte=start, date__lte=end
+            ).values('course_id').annotate(sessions=Count('id')).values_list('course_id', 'sessions')
+        )
+
+    course_ids = set(attended) | set(held)
+    names = _course_names(course_ids)
+    data = []
+    for course_id in course_ids:
+        present = attended.get(course_id, {}).get('present', 0)
+        late = attended.get(course_id, {}).get('late', 0)
+        sessions = max(held.get(course_id, 0), present + late)
+        data.append({
+            'course': names.get(course_id, {'id': course_id}),
+            'sessions_held': sessions,
+            'present': present,
+            'late': late,
+            'absent': sessions - present - late,
+            'attendance_rate': _rate(present + late, sessions),
+        })
+    data.sort(key=lambda item: item['course'].get('name') or '')
+
+    return {
+        'student': {'id': student.id, 'name': student.name, 'regNumber': student.regNumber},
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'courses': data,
+    }
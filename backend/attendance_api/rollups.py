@@ -0,0 +1,154 @@
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .models import AttendanceRollup, AttendanceStatus, SessionRollup, TimetableEntry
+
+
+def _rollup_key(row):
+    if row.student_id is not None:
+        return row.date, row.timetable_entry_id, 'student', row.student_id
+    return row.date, row.timetable_entry_id, 'teacher', row.teacher_id
+
+
+def _group_scans(events):
+    """(date, entry, kind, person) -> [first scan, its status, scan count] for in-session scans of known people."""
+    tz = timezone.get_current_timezone()
+    groups = {}
+    for event in events:
+        if event.timetable_entry_id is None:
+            continue
+        if event.student_id is not None:
+            person = ('student', event.student_id)
+        elif event.teacher_id is not None:
+            person = ('teacher', event.teacher_id)
+        else:
+            continue
+        key = (event.timestamp.astimezone(tz).date(), event.timetable_entry_id) + person
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [event.timestamp, event.status, 1]
+        else:
+            if event.timestamp < group[0]:
+                group[0], group[1] = event.timestamp, event.status
+            group[2] += 1
+    return groups
+
+
+def _lock_rows(model, key_of, dates, entry_ids, placeholders):
+    """Lock the rollup rows for every key of ``placeholders``, creating missing ones first.
+
+    Missing rows are inserted from ``placeholders`` (key -> unsaved row with
+    zero counts) with ON CONFLICT DO NOTHING and then re-read under lock, so
+    when a concurrent ingest creates the same row first this batch adds to
+    it instead of failing on the unique constraint. A locked row whose
+    counts are still zero was created by this batch.
+    """
+
+    def locked():
+        return {
+            key_of(row): row
+            for row in model.objects.select_for_update().filter(
+                date__in=dates, timetable_entry_id__in=entry_ids
+            )
+        }
+
+    rows = locked()
+    missing = [row for key, row in placeholders.items() if key not in rows]
+    if missing:
+        model.objects.bulk_create(missing, ignore_conflicts=True)
+        rows = locked()
+    return rows
+
+
+def _session_key(row):
+    return row.date, row.timetable_entry_id
+
+
+def apply_scan_events(events):
+    """Fold newly stored scan events into the daily rollups.
+
+    Runs inside the ingest transaction: the touched rollup rows are locked
+    (missing ones inserted first, see _lock_rows) and bulk-updated, so a
+    batch costs a handful of queries however many scans it holds. A scan
+    that arrives out of order and precedes the recorded first scan
+    re-evaluates the late/present status (taken from the scan's own
+    classification).
+    """
+    groups = _group_scans(events)
+    if not groups:
+        return
+
+    entry_ids = {key[1] for key in groups}
+    entries = {
+        row[0]: row[1:]
+        for row in TimetableEntry.objects.filter(id__in=entry_ids).values_list(
+            'id', 'program_id', 'course_id', 'year'
+        )
+    }
+    groups = {key: group for key, group in groups.items() if key[1] in entries}
+    if not groups:
+        return
+    dates = {key[0] for key in groups}
+    entry_ids = set(entries)
+
+    rows = _lock_rows(AttendanceRollup, _rollup_key, dates, entry_ids, {
+        key: AttendanceRollup(
+            date=key[0],
+            timetable_entry_id=key[1],
+            course_id=entries[key[1]][1],
+            status=status,
+            scan_count=0,
+            first_scan_at=first_scan_at,
+            **{f'{key[2]}_id': key[3]},
+        )
+        for key, (first_scan_at, status, _) in groups.items()
+    })
+
+    # (date, entry) -> [present delta, late delta, teacher seen]
+    session_deltas = defaultdict(lambda: [0, 0, False])
+    changed = []
+
+    for key, (first_scan_at, status, count) in groups.items():
+        date, entry_id, kind, _ = key
+        delta = session_deltas[(date, entry_id)]
+
+        row = rows[key]
+        if row.scan_count == 0:
+            row.first_scan_at = first_scan_at
+            row.status = status
+            if kind == 'student':
+                delta[status == AttendanceStatus.LATE] += 1
+        elif first_scan_at < row.first_scan_at:
+            if kind == 'student' and row.status != status:
+                delta[row.status == AttendanceStatus.LATE] -= 1
+                delta[status == AttendanceStatus.LATE] += 1
+            row.first_scan_at = first_scan_at
+            row.status = status
+        row.scan_count += count
+        changed.append(row)
+
+        if kind == 'teacher':
+            delta[2] = True
+
+    AttendanceRollup.objects.bulk_update(changed, ['scan_count', 'first_scan_at', 'status'])
+
+    sessions = _lock_rows(SessionRollup, _session_key, dates, entry_ids, {
+        (date, entry_id): SessionRollup(
+            date=date,
+            timetable_entry_id=entry_id,
+            program_id=entries[entry_id][0],
+            course_id=entries[entry_id][1],
+            year=entries[entry_id][2],
+        )
+        for date, entry_id in session_deltas
+    })
+    changed_sessions = []
+    for key, (present, late, teacher_seen) in session_deltas.items():
+        session = sessions[key]
+        session.present_count += present
+        session.late_count += late
+        session.teacher_present = session.teacher_present or teacher_seen
+        changed_sessions.append(session)
+
+    SessionRollup.objects.bulk_update(changed_sessions, ['present_count', 'late_count', 'teacher_present'])
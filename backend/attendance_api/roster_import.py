@@ -0,0 +1,175 @@
+import csv
+from itertools import islice
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from .models import Student, Teacher
+from .stats_cache import stats_cache
+
+IMPORT_CHUNK_SIZE = getattr(settings, 'ROSTER_IMPORT_CHUNK_SIZE', 500)
+
+
+class RosterSpec:
+    def __init__(self, model, key, required, optional):
+        self.model = model
+        self.key = key
+        self.required = required
+        self.optional = optional
+
+    @property
+    def columns(self):
+        return self.required + self.optional
+
+
+# hasRfid/hasFingerprint are not importable: they follow the person's Credential
+# rows, so those columns (present in exports) are ignored like any unknown one
+ROSTERS = {
+    'students': RosterSpec(
+        Student,
+        key='regNumber',
+        required=['name', 'regNumber', 'program', 'year'],
+        optional=[],
+    ),
+    'teachers': RosterSpec(
+        Teacher,
+        key='email',
+        required=['name', 'email', 'course', 'department'],
+        optional=[],
+    ),
+}
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, row_number, errors):
+        self.rejected += 1
+        self.errors.append({'row': row_number, 'errors': errors})
+
+    def to_dict(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'rejected': self.rejected,
+            'errors': self.errors,
+        }
+
+
+class RosterImportError(ValueError):
+    """The file itself is unusable (e.g. missing required columns)."""
+
+
+def _clean_row(spec, raw):
+    values = {}
+    errors = {}
+
+    for column in spec.columns:
+        if column not in raw:
+            continue
+        value = (raw[column] or '').strip()
+        field = spec.model._meta.get_field(column)
+
+        if column in spec.required and not value:
+            errors[column] = 'This field is required.'
+        elif field.get_internal_type() == 'IntegerField':
+            try:
+                values[column] = int(value)
+            except ValueError:
+                errors[column] = 'A valid integer is required.'
+        elif field.max_length and len(value) > field.max_length:
+            errors[column] = f'Ensure this field has no more than {field.max_length} characters.'
+        else:
+            values[column] = value
+
+    return values, errors
+
+
+def _upsert_chunk(spec, rows, update_fields, report):
+    keys = [values[spec.key] for _, values in rows]
+    existing = set(
+        spec.model.objects.filter(**{f'{spec.key}__in': keys}).values_list(spec.key, flat=True)
+    )
+    spec.model.objects.bulk_create(
+        [spec.model(**values) for _, values in rows],
+        update_conflicts=True,
+        unique_fields=[spec.key],
+        update_fields=update_fields,
+    )
+    report.updated += len(existing)
+    report.created += len(rows) - len(existing)
+
+
+def _write_chunk(spec, rows, update_fields, report, seen):
+    """Upsert a chunk; if the database refuses it, retry row by row and report the rows it refuses."""
+    try:
+        with transaction.atomic():
+            _upsert_chunk(spec, rows, update_fields, report)
+        return
+    except DatabaseError:
+        pass
+
+    for row_number, values in rows:
+        try:
+            with transaction.atomic():
+                _upsert_chunk(spec, [(row_number, values)], update_fields, report)
+        except DatabaseError as e:
+            report.reject(row_number, {'non_field_errors': f'Could not be saved: {e}'})
+            seen.pop(values[spec.key], None)
+
+
+def import_roster(kind, text_stream, chunk_size=IMPORT_CHUNK_SIZE):
+    """Stream a CSV roster and upsert it on the roster key, one chunk at a time.
+
+    Invalid rows are reported (by 1-based file line) and skipped; valid rows
+    in the same chunk are still written. Each chunk commits on its own so a
+    large file never holds one long write transaction, and a chunk the
+    database rejects is retried row by row so only the offending rows are
+    reported and everything else is written.
+    """
+    spec = ROSTERS[kind]
+    reader = csv.DictReader(text_stream)
+
+    header = [column.strip() for column in (reader.fieldnames or [])]
+    missing = [column for column in spec.required if column not in header]
+    if missing:
+        raise RosterImportError(f"Missing required column(s): {', '.join(missing)}")
+    reader.fieldnames = header
+
+    update_fields = [
+        column for column in spec.columns if column in header and column != spec.key
+    ] + ['updated_at']
+
+    report = ImportReport()
+    seen = {}
+    # Header is line 1, so data rows start at line 2
+    numbered = enumerate(reader, start=2)
+
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+
+        valid = []
+        for row_number, raw in chunk:
+            values, errors = _clean_row(spec, raw)
+            key = values.get(spec.key)
+            if key is not None and key in seen:
+                errors[spec.key] = f'Duplicate {spec.key} in file (first seen on row {seen[key]}).'
+            if errors:
+                report.reject(row_number, errors)
+                continue
+            seen[key] = row_number
+            valid.append((row_number, values))
+
+        if valid:
+            _write_chunk(spec, valid, update_fields, report, seen)
+
+    if report.created:
+        # bulk_create skips the signals that normally announce new rows
+        stats_cache.changed()
+    return report
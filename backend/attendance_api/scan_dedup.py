@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+SCAN_DEDUP_WINDOW = getattr(settings, 'SCAN_DEDUP_WINDOW', 2.0)
+SCAN_DEDUP_MAX_KEYS = getattr(settings, 'SCAN_DEDUP_MAX_KEYS', 100000)
+
+
+class SwipeDeduper:
+    """Drops repeat reads of the same tag on the same device.
+
+    Keeps the latest read time per (device, tag) in an LRU map bounded to
+    ``max_keys`` entries. A read within ``window`` seconds (by scan timestamp,
+    not arrival time, so batched uploads dedup the same way) of the previous
+    read is a duplicate and also extends the window, so a card left on the
+    antenna produces a single event.
+    """
+
+    def __init__(self, window=SCAN_DEDUP_WINDOW, max_keys=SCAN_DEDUP_MAX_KEYS):
+        self.window = window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._last_read = OrderedDict()
+        self.seen = 0
+        self.suppressed = 0
+        self.evicted = 0
+
+    def is_duplicate(self, device_id, tag_uid, timestamp):
+        key = (device_id, tag_uid)
+        with self._lock:
+            self.seen += 1
+            previous = self._last_read.get(key)
+            if previous is not None and abs((timestamp - previous).total_seconds()) < self.window:
+                self.suppressed += 1
+                if timestamp > previous:
+                    self._last_read[key] = timestamp
+                self._last_read.move_to_end(key)
+                return True
+
+            self._last_read[key] = timestamp
+            self._last_read.move_to_end(key)
+            if len(self._last_read) > self.max_keys:
+                self._last_read.popitem(last=False)
+                self.evicted += 1
+            return False
+
+    def forget(self, events):
+        """Un-record accepted events that were never stored, so a retry is not dropped."""
+        with self._lock:
+            for event in events:
+                self._last_read.pop((event.device_id, event.tag_uid), None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'window_seconds': self.window,
+                'tracked_keys': len(self._last_read),
+                'max_keys': self.max_keys,
+                'seen': self.seen,
+                'suppressed': self.suppressed,
+                'evicted': self.evicted,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._last_read.clear()
+
+
+swipe_deduper = SwipeDeduper()
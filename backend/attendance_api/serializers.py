@@ -1,7 +1,11 @@
 from os import write
 
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Student, Teacher, Device, Program, Course, TimetableEntry, User
+from rest_framework.relations import MANY_RELATION_KWARGS
+from .models import Student, Teacher, Device, Program, Course, TimetableEntry, User, Credential, ScanEvent
+from .timetable_conflicts import check_conflicts, candidate_from_data
 
 
 class BulkDeleteSerializer(serializers.Serializer):
@@ -20,21 +24,119 @@ class BulkDeleteSerializer(serializers.Serializer):
             )
         return value
 
-class StudentSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """Accepts a ``fields`` kwarg that limits the serialized output to those names."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class CredentialFieldsMixin:
+    """Write-only rfidUid/fingerprintId fields backed by the Credential table.
+
+    Sending a value registers (or replaces) the credential and sets the matching
+    has* flag; sending null or an empty string removes it. The person and
+    their credentials are saved in one transaction.
+    """
+    credential_owner_field = None
+    credential_fields = {
+        'rfidUid': (Credential.CredentialType.RFID, 'hasRfid'),
+        'fingerprintId': (Credential.CredentialType.FINGERPRINT, 'hasFingerprint'),
+    }
+
+    def _validate_credential_uid(self, value, name):
+        if not value:
+            return value
+        value = value.strip()
+        taken = Credential.objects.filter(uid=value).first()
+        if taken is None:
+            return value
+        owner_id = getattr(taken, f'{self.credential_owner_field}_id')
+        if self.instance is None or owner_id != self.instance.pk:
+            raise serializers.ValidationError("This credential is already assigned to someone else.")
+        if taken.type != self.credential_fields[name][0]:
+            raise serializers.ValidationError(
+                f"This is already this person's {taken.get_type_display()} credential."
+            )
+        return value
+
+    def validate_rfidUid(self, value):
+        return self._validate_credential_uid(value, 'rfidUid')
+
+    def validate_fingerprintId(self, value):
+        return self._validate_credential_uid(value, 'fingerprintId')
+
+    def validate(self, data):
+        data = super().validate(data)
+        if data.get('rfidUid') and data.get('rfidUid') == data.get('fingerprintId'):
+            raise serializers.ValidationError({
+                'fingerprintId': 'The RFID tag and fingerprint must have different IDs.'
+            })
+        return data
+
+    def _pop_credentials(self, validated_data):
+        return {
+            name: validated_data.pop(name)
+            for name in self.credential_fields
+            if name in validated_data
+        }
+
+    def _sync_credentials(self, person, credentials):
+        if not credentials:
+            return
+        changed_flags = []
+        for name, uid in credentials.items():
+            credential_type, flag = self.credential_fields[name]
+            owner = {self.credential_owner_field: person, 'type': credential_type}
+            if uid:
+                Credential.objects.update_or_create(**owner, defaults={'uid': uid})
+            else:
+                Credential.objects.filter(**owner).delete()
+            setattr(person, flag, bool(uid))
+            changed_flags.append(flag)
+        person.save(update_fields=changed_flags + ['updated_at'])
+
+    def create(self, validated_data):
+        credentials = self._pop_credentials(validated_data)
+        with transaction.atomic():
+            person = super().create(validated_data)
+            self._sync_credentials(person, credentials)
+        return person
+
+    def update(self, instance, validated_data):
+        credentials = self._pop_credentials(validated_data)
+        with transaction.atomic():
+            person = super().update(instance, validated_data)
+            self._sync_credentials(person, credentials)
+        return person
+
+
+class StudentSerializer(CredentialFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)  # To match your Dart model's string id
+    rfidUid = serializers.CharField(write_only=True, required=False, allow_null=True, allow_blank=True, max_length=100)
+    fingerprintId = serializers.CharField(write_only=True, required=False, allow_null=True, allow_blank=True, max_length=100)
+
+    credential_owner_field = 'student'
 
     class Meta:
         model = Student
-        fields = ['id', 'name', 'regNumber', 'program', 'year', 'hasRfid', 'hasFingerprint']
+        fields = ['id', 'name', 'regNumber', 'program', 'year', 'hasRfid', 'hasFingerprint', 'rfidUid', 'fingerprintId']
 
     def to_representation(self, instance):
         """Convert the response to match your Dart model's fromJson method"""
         representation = super().to_representation(instance)
         # Convert id to string if needed (Dart expects string)
-        representation['id'] = str(representation['id'])
+        if 'id' in representation:
+            representation['id'] = str(representation['id'])
         # Convert booleans to 1/0 if needed (your Dart code accepts both)
-        representation['hasRfid'] = 1 if representation['hasRfid'] else 0
-        representation['hasFingerprint'] = 1 if representation['hasFingerprint'] else 0
+        if 'hasRfid' in representation:
+            representation['hasRfid'] = 1 if representation['hasRfid'] else 0
+        if 'hasFingerprint' in representation:
+            representation['hasFingerprint'] = 1 if representation['hasFingerprint'] else 0
         return representation
 
     def to_internal_value(self, data):
@@ -46,18 +148,25 @@ class StudentSerializer(serializers.ModelSerializer):
             data['hasFingerprint'] = bool(data['hasFingerprint']) if isinstance(data['hasFingerprint'], (int, str)) else data['hasFingerprint']
         return super().to_internal_value(data)
 
-class TeacherSerializer(serializers.ModelSerializer):
+class TeacherSerializer(CredentialFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
+    rfidUid = serializers.CharField(write_only=True, required=False, allow_null=True, allow_blank=True, max_length=100)
+    fingerprintId = serializers.CharField(write_only=True, required=False, allow_null=True, allow_blank=True, max_length=100)
+
+    credential_owner_field = 'teacher'
 
     class Meta:
         model = Teacher
-        fields = ['id', 'name', 'email', 'course', 'department', 'hasRfid', 'hasFingerprint']
+        fields = ['id', 'name', 'email', 'course', 'department', 'hasRfid', 'hasFingerprint', 'rfidUid', 'fingerprintId']
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation['id'] = str(representation['id'])
-        representation['hasRfid'] = 1 if representation['hasRfid'] else 0
-        representation['hasFingerprint'] = 1 if representation['hasFingerprint'] else 0
+        if 'id' in representation:
+            representation['id'] = str(representation['id'])
+        if 'hasRfid' in representation:
+            representation['hasRfid'] = 1 if representation['hasRfid'] else 0
+        if 'hasFingerprint' in representation:
+            representation['hasFingerprint'] = 1 if representation['hasFingerprint'] else 0
         return representation
 
     def to_internal_value(self, data):
@@ -68,19 +177,21 @@ class TeacherSerializer(serializers.ModelSerializer):
         return super().to_internal_value(data)
 
 
-class DeviceSerializer(serializers.ModelSerializer):
+class DeviceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Device
         fields = ['id', 'name', 'type', 'location', 'lastSeen', 'status',]
+        # Both come from heartbeats only (see device_heartbeat)
+        read_only_fields = ['lastSeen', 'status']
 
         def to_representation(self, instance):
             rep = super().to_representation(instance)
             rep['id'] = str(rep['id'])
             return rep
 
-class ProgramSerializer(serializers.ModelSerializer):
+class ProgramSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     duration = serializers.IntegerField(
         error_messages ={
             'invalid': 'Duration must be an integer (number of years)'
@@ -108,7 +219,59 @@ class ProgramSerializer(serializers.ModelSerializer):
         return data
 
 
-class CourseSerializer(serializers.ModelSerializer):
+def courses_with_programs(queryset=None):
+    """Courses with the program ids and abbreviations CourseSerializer renders, in one extra query."""
+    if queryset is None:
+        queryset = Course.objects.all()
+    return queryset.prefetch_related(
+        Prefetch('programs', queryset=Program.objects.only('id', 'abbreviation'))
+    )
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """ManyRelatedField that resolves the whole list with one in_bulk() query.
+
+    Stock ManyRelatedField looks every primary key up separately. Error
+    messages are the same, reported for the first bad item.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        pks = []
+        for value in data:
+            if isinstance(value, bool):
+                child.fail('incorrect_type', data_type=type(value).__name__)
+            try:
+                pks.append(int(value))
+            except (TypeError, ValueError):
+                child.fail('incorrect_type', data_type=type(value).__name__)
+
+        found = child.get_queryset().in_bulk(set(pks))
+        for value, pk in zip(data, pks):
+            if pk not in found:
+                child.fail('does_not_exist', pk_value=value)
+        return [found[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField whose ``many=True`` form is a BulkManyRelatedField."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+
+class CourseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    programs = BulkPrimaryKeyRelatedField(many=True, allow_empty=False, queryset=Program.objects.all())
     program_abbreviations = serializers.SerializerMethodField()
 
     class Meta:
@@ -146,7 +309,7 @@ class CourseSerializer(serializers.ModelSerializer):
         programs = validated_data.pop('programs')
         course = Course.objects.create(**validated_data)
         course.programs.set(programs)
-        return course
+        return courses_with_programs().get(pk=course.pk)
 
     def update(self, instance, validated_data):
         programs = validated_data.pop('programs', None)
@@ -155,13 +318,37 @@ class CourseSerializer(serializers.ModelSerializer):
         instance.save()
         if programs is not None:
             instance.programs.set(programs)
+        return courses_with_programs().get(pk=instance.pk)
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField that resolves against ``context['preloaded'][Model]``.
+
+    Bulk endpoints fetch every referenced row once with in_bulk() and pass the
+    dicts in the serializer context, so validating N items costs no queries.
+    Without preloaded data it behaves exactly like PrimaryKeyRelatedField.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.queryset.model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        instance = preloaded.get(pk)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
         return instance
 
-class TimetableEntrySerializer(serializers.ModelSerializer):
-    program = serializers.PrimaryKeyRelatedField(queryset=Program.objects.all())
-    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
-    teacher = serializers.PrimaryKeyRelatedField(queryset=Teacher.objects.all())
-    device = serializers.PrimaryKeyRelatedField(
+
+class TimetableEntrySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    program = PreloadedPrimaryKeyRelatedField(queryset=Program.objects.all())
+    course = PreloadedPrimaryKeyRelatedField(queryset=Course.objects.all())
+    teacher = PreloadedPrimaryKeyRelatedField(queryset=Teacher.objects.all())
+    device = PreloadedPrimaryKeyRelatedField(
         queryset=Device.objects.all(),
         allow_null=True,
         required=False
@@ -183,11 +370,43 @@ class TimetableEntrySerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         rep = super().to_representation(instance)
-        rep['id'] = str(rep['id'])
+        if 'id' in rep:
+            rep['id'] = str(rep['id'])
         return rep
     def to_internal_value(self, data):
         return super().to_internal_value(data)
 
+    def validate(self, data):
+        # Bulk create checks the whole batch in one pass instead (see check_conflicts)
+        if self.context.get('skip_conflict_check'):
+            return data
+
+        candidate = candidate_from_data(data, 'new', self.instance)
+        exclude = [self.instance.pk] if self.instance is not None else []
+        conflicts = check_conflicts([candidate], exclude_ids=exclude)
+        if conflicts:
+            raise serializers.ValidationError({'conflicts': conflicts})
+        return data
+
+class ScanEventSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    device_name = serializers.CharField(source='device.name', read_only=True)
+    student_name = serializers.CharField(source='student.name', read_only=True, allow_null=True)
+    teacher_name = serializers.CharField(source='teacher.name', read_only=True, allow_null=True)
+
+    class Meta:
+        model = ScanEvent
+        fields = [
+            'id', 'device', 'device_name', 'tag_uid', 'timestamp', 'sequence', 'student', 'student_name',
+            'teacher', 'teacher_name', 'timetable_entry', 'status', 'received_at'
+        ]
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        rep = super().to_representation(instance)
+        if 'id' in rep:
+            rep['id'] = str(rep['id'])
+        return rep
+
 class UserSerializer(serializers.ModelSerializer):
     role_display = serializers.SerializerMethodField()
 
@@ -0,0 +1,52 @@
+"""Session engines whose expiry refresh is debounced.
+
+``SESSION_SAVE_EVERY_REQUEST`` makes the session middleware call ``save()``
+on every response just to push the expiry forward, which for database
+sessions is an UPDATE per request. The stores here skip that write when the
+session data is unchanged and it was already written less than
+``SESSION_SAVE_INTERVAL`` seconds ago. Real changes are always saved.
+Only the write is skipped: the ``db`` store still reads the session row on
+every request, which the ``cached_db`` and ``cache`` stores avoid.
+
+The "recently written" markers live in the session cache. With a
+per-process cache each worker debounces on its own, which only means up to
+one write per worker per interval; the session itself stays in the database.
+
+Point ``SESSION_ENGINE`` at ``attendance_api.sessions.db``, ``.cached_db`` or
+``.cache``.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+SESSION_SAVE_INTERVAL = getattr(settings, 'SESSION_SAVE_INTERVAL', 60)
+
+
+class DebouncedSaveMixin:
+    touch_key_prefix = 'attendance_api.sessions.touched:'
+
+    def _touch_cache(self):
+        return caches[settings.SESSION_CACHE_ALIAS]
+
+    def _touch_key(self):
+        return self.touch_key_prefix + self.session_key
+
+    def save(self, must_create=False):
+        if (
+            not must_create
+            and not self.modified
+            and self.session_key is not None
+            and SESSION_SAVE_INTERVAL > 0
+            # add() only succeeds once per interval, so one request writes
+            and not self._touch_cache().add(self._touch_key(), True, SESSION_SAVE_INTERVAL)
+        ):
+            return
+        super().save(must_create=must_create)
+        if self.session_key is not None and SESSION_SAVE_INTERVAL > 0:
+            self._touch_cache().set(self._touch_key(), True, SESSION_SAVE_INTERVAL)
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if key is not None:
+            self._touch_cache().delete(self.touch_key_prefix + key)
+        super().delete(session_key)
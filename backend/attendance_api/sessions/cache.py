@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.cache import SessionStore as BaseCacheStore
+
+from . import DebouncedSaveMixin
+
+
+class SessionStore(DebouncedSaveMixin, BaseCacheStore):
+    pass
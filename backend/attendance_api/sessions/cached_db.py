@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.cached_db import SessionStore as BaseCachedDBStore
+
+from . import DebouncedSaveMixin
+
+
+class SessionStore(DebouncedSaveMixin, BaseCachedDBStore):
+    pass
@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.db import SessionStore as BaseDBStore
+
+from . import DebouncedSaveMixin
+
+
+class SessionStore(DebouncedSaveMixin, BaseDBStore):
+    pass
@@ -0,0 +1,62 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Credential, Device, TimetableEntry, User
+from .credential_index import credential_index
+from .timetable_index import timetable_index
+from .device_heartbeat import heartbeat_tracker
+from .user_cache import user_cache
+from .stats_cache import stats_cache, COUNTED_MODELS
+from .metrics import install_query_recorder
+
+
+@receiver(post_save, sender=Credential)
+@receiver(post_delete, sender=Credential)
+def credential_changed(sender, instance, **kwargs):
+    credential_index.changed()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=TimetableEntry)
+@receiver(post_delete, sender=TimetableEntry)
+def timetable_entry_changed(sender, instance, **kwargs):
+    timetable_index.changed()
+
+
+@receiver(post_save, sender=Device)
+def device_saved(sender, instance, created, **kwargs):
+    if created:
+        heartbeat_tracker.device_added(instance.pk)
+    stats_cache.changed()
+
+
+@receiver(post_delete, sender=Device)
+def device_deleted(sender, instance, **kwargs):
+    heartbeat_tracker.device_removed(instance.pk)
+    stats_cache.changed()
+
+
+def counted_model_saved(sender, instance, created, **kwargs):
+    if created:
+        stats_cache.changed()
+
+
+def counted_model_deleted(sender, instance, **kwargs):
+    # Also fires per row for QuerySet.delete(), i.e. the bulk delete views
+    stats_cache.changed()
+
+
+for counted_model in COUNTED_MODELS:
+    post_save.connect(counted_model_saved, sender=counted_model)
+    post_delete.connect(counted_model_deleted, sender=counted_model)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    install_query_recorder(connection)
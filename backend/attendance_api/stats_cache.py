@@ -0,0 +1,79 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .index_generation import IndexGeneration
+from .models import Student, Teacher, Program, Course, Device
+
+STATS_RECOMPUTE_INTERVAL = getattr(settings, 'STATS_RECOMPUTE_INTERVAL', 300)
+
+COUNTED_MODELS = {
+    Student: 'students',
+    Teacher: 'teachers',
+    Program: 'programs',
+    Course: 'courses',
+}
+
+
+def count_all():
+    """Every dashboard counter in a single round trip."""
+    quote = connection.ops.quote_name
+    selects = [
+        f'(SELECT COUNT(*) FROM {quote(model._meta.db_table)})'
+        for model in COUNTED_MODELS
+    ]
+    device_table = quote(Device._meta.db_table)
+    status_column = quote(Device._meta.get_field('status').column)
+    selects.append(f'(SELECT COUNT(*) FROM {device_table} WHERE {status_column} = %s)')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(selects)}", [Device.DeviceStatus.ONLINE])
+        row = cursor.fetchone()
+
+    keys = list(COUNTED_MODELS.values()) + ['active_devices']
+    return dict(zip(keys, row))
+
+
+class StatsCache:
+    """Dashboard counters, recounted in one query only when something changed.
+
+    Writes to the counted tables call changed() (the model signals, bulk
+    imports and heartbeat flushes do), which on commit drops this process's
+    counts and moves a generation shared through the cache, so every other
+    worker recounts within its check interval. A full recount also happens
+    every ``recompute_interval`` seconds to absorb writes that bypass them.
+    """
+
+    def __init__(self, recompute_interval=STATS_RECOMPUTE_INTERVAL):
+        self.recompute_interval = recompute_interval
+        self.generation = IndexGeneration('stats_cache')
+        self._lock = threading.Lock()
+        self._counts = None
+        self._computed_at = 0.0
+
+    def _expired(self):
+        return self._counts is None or time.monotonic() - self._computed_at > self.recompute_interval
+
+    def snapshot(self):
+        counts = self._counts
+        if self._expired() or self.generation.changed():
+            with self._lock:
+                if self._expired() or self.generation.changed(force=True):
+                    generation = self.generation.current()
+                    self._counts = count_all()
+                    self._computed_at = time.monotonic()
+                    self.generation.loaded(generation)
+                counts = self._counts
+        return dict(counts)
+
+    def changed(self):
+        self.generation.bump(then=self.invalidate)
+
+    def invalidate(self):
+        with self._lock:
+            self._counts = None
+
+
+stats_cache = StatsCache()
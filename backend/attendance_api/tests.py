@@ -1,3 +1,1200 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import tempfile
+import time
+from datetime import datetime, time as dtime
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from . import async_ingest, checks, login_throttle, middleware, partitions, sessions, timetable_conflicts
+from .credential_index import CredentialIndex, credential_index
+from .device_heartbeat import heartbeat_tracker
+from .hashers import TunablePBKDF2PasswordHasher
+from .management.commands.explain_list_queries import full_scans
+from .ingest import IngestResult, _store, build_scan_events, ingest_scan_events
+from .live_events import Subscription, broadcaster
+from .metrics import request_metrics
+from .models import (
+    ArchivedPartition, AttendanceRollup, AttendanceStatus, Course, Credential, Device, Program, ScanEvent,
+    SessionRollup, Student, Teacher, TimetableEntry, User,
+)
+from .scan_dedup import swipe_deduper
+from .sessions.db import SessionStore
+from .serializers import (
+    ProgramSerializer, ScanEventSerializer, StudentSerializer, TeacherSerializer, TimetableEntrySerializer,
+)
+from .stats_cache import StatsCache, stats_cache
+from .timetable_index import TimetableIndex, timetable_index
+from .user_cache import user_cache
+
+
+def make_device(name='Lab reader', location='Lab 1', **extra):
+    return Device.objects.create(name=name, type='rfid', location=location, **extra)
+
+
+def make_program(abbreviation='CS', name='Computing'):
+    return Program.objects.create(
+        name=name, abbreviation=abbreviation, duration=3, department='Computing', qualification='Diploma'
+    )
+
+
+def make_course(code='DB101', name='Databases'):
+    return Course.objects.create(name=name, code=code, qualification='Diploma', semester=1, year=1)
+
+
+def make_teacher(name='T', email='t@example.com'):
+    return Teacher.objects.create(name=name, email=email, course='DB101', department='Computing')
+
+
+def make_students(count, **extra):
+    return [
+        Student.objects.create(name=f'S{i}', regNumber=f'R{i}', program='CS', year=1, **extra)
+        for i in range(count)
+    ]
+
+
+def make_entry(program, course, device, teacher=None, **extra):
+    """A Monday 08:00-10:00 session unless ``extra`` says otherwise."""
+    fields = {
+        'location': 'Lab 1', 'year': 1, 'day': 'Monday', 'startTime': '08:00', 'endTime': '10:00',
+        'qualification': 'Diploma',
+    }
+    fields.update(extra)
+    return TimetableEntry.objects.create(program=program, course=course, teacher=teacher, device=device, **fields)
+
+
+class ApiTestCase(TestCase):
+    """Posts JSON to the attendance_api routes."""
+
+    def post(self, url, data):
+        return self.client.post(f'/attendance_api/{url}', json.dumps(data), content_type='application/json')
+
+
+class CourseQueryCountTests(ApiTestCase):
+    """Course endpoints must cost the same number of queries however many programs a course has."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.programs = [make_program(f'P{i}', f'Program {i}') for i in range(5)]
+        cls.retired = make_program('RET', 'Retired')
+
+    def course_data(self, programs, **extra):
+        return dict({
+            'name': 'Databases',
+            'code': 'DB101',
+            'qualification': 'Diploma',
+            'semester': 1,
+            'year': 1,
+            'programs': [program.id for program in programs],
+        }, **extra)
+
+    def make_course(self, programs, code):
+        course = make_course(code, f'Course {code}')
+        course.programs.set(programs)
+        return course
+
+    def test_list(self):
+        for count in (1, 3, 5):
+            self.make_course(self.programs[:count], f'L{count}')
+
+        # Courses, then every course's programs
+        with self.assertNumQueries(2):
+            response = self.client.get('/attendance_api/courses/list/')
+
+        self.assertEqual(response.status_code, 200)
+        abbreviations = {item['code']: item['program_abbreviations'] for item in response.json()['data']}
+        self.assertEqual(abbreviations['L5'], ['P0', 'P1', 'P2', 'P3', 'P4'])
+
+    def test_create(self):
+        for count in (1, 5):
+            programs = self.programs[:count]
+            # Programs, course insert, through-table read and insert, then the course reloaded with its programs
+            with self.assertNumQueries(6):
+                response = self.post('courses/create/', self.course_data(programs, code=f'C{count}'))
+
+            self.assertEqual(response.status_code, 201)
+            data = response.json()['data']
+            self.assertEqual(data['programs'], [program.id for program in programs])
+            self.assertEqual(data['program_abbreviations'], [program.abbreviation for program in programs])
+
+    def test_update(self):
+        for count in (1, 5):
+            course = self.make_course([self.retired], f'U{count}')
+            programs = self.programs[:count]
+            # Course, programs, update, program set diff (read, delete, insert), course reloaded with its programs
+            with self.assertNumQueries(8):
+                response = self.post(
+                    'courses/update/', self.course_data(programs, id=course.id, code=f'U{count}')
+                )
+
+            self.assertEqual(response.status_code, 200)
+            data = response.json()['data']
+            self.assertEqual(data['program_abbreviations'], [program.abbreviation for program in programs])
+
+    def test_unknown_program(self):
+        with self.assertNumQueries(1):
+            response = self.post('courses/create/', self.course_data(self.programs[:2] + [Program(id=999)]))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message']['programs'], ['Invalid pk "999" - object does not exist.'])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ListParamTests(ApiTestCase):
+    """?limit=/?cursor= keyset pages and ?fields= projection on the list endpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = make_students(5)
+        cls.courses = [make_course(code) for code in ('DB101', 'DB102', 'DB103')]
+
+    def get(self, url):
+        response = self.client.get(f'/attendance_api/{url}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def pages(self, url, limit):
+        pages = []
+        query = f'limit={limit}'
+        while query is not None:
+            body = self.get(f'{url}?{query}')
+            pages.append([row['id'] for row in body['data']])
+            query = body['next_cursor'] and f"limit={limit}&cursor={body['next_cursor']}"
+        return pages
+
+    def test_cursor_pages_cover_every_row_once(self):
+        ids = [str(student.id) for student in self.students]
+        self.assertEqual(self.pages('students/list/', 2), [ids[0:2], ids[2:4], ids[4:]])
+        # DRF path (no fast serializer)
+        ids = [course.id for course in self.courses]
+        self.assertEqual(self.pages('courses/list/', 2), [ids[0:2], ids[2:]])
+
+    def test_unpaginated_lists_are_whole_and_have_no_cursor(self):
+        body = self.get('students/list/')
+        self.assertEqual(len(body['data']), 5)
+        self.assertNotIn('next_cursor', body)
+
+    def test_fields_keep_serializer_order(self):
+        rows = self.get('students/list/?fields=regNumber,name')['data']
+        self.assertEqual(rows[0], {'name': 'S0', 'regNumber': 'R0'})
+        self.assertEqual({tuple(row) for row in rows}, {('name', 'regNumber')})
+
+        rows = self.get('courses/list/?fields=program_abbreviations,code&limit=1')['data']
+        self.assertEqual(rows, [{'code': 'DB101', 'program_abbreviations': []}])
+
+    def test_bad_parameters_are_rejected(self):
+        for query in ('fields=name,rfidUid', 'fields=nope', 'limit=0', 'limit=x', 'cursor=not-a-cursor'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/attendance_api/students/list/?{query}')
+                self.assertEqual(response.status_code, 400, response.content)
+
+
+class FastSerializerTests(ApiTestCase):
+    """List endpoints read through values_list() return exactly what the DRF serializers would render."""
+
+    @classmethod
+    def setUpTestData(cls):
+        students = make_students(2)
+        Student.objects.filter(pk=students[1].pk).update(hasRfid=True)
+        teacher = make_teacher()
+        device = make_device()
+        program = make_program()
+        course = make_course()
+        make_entry(program, course, device, teacher)
+        # An unassigned session, whose teacher_name DRF leaves out
+        make_entry(program, course, device, day='Tuesday')
+        now = timezone.now()
+        scan = dict(device=device, timestamp=now, period=partitions.period_of(now))
+        ScanEvent.objects.create(tag_uid='TAG-S0', student=students[0], **scan)
+        ScanEvent.objects.create(tag_uid='TAG-X', sequence=7, **scan)
+
+    def assertRendersLikeDrf(self, url, queryset, serializer_class, fields=None):
+        # Paged, so both sides are in id order (whole lists have no fixed order)
+        query = f"&fields={','.join(fields)}" if fields else ''
+        response = self.client.get(f'/attendance_api/{url}?limit=100{query}')
+        expected = JSONRenderer().render({
+            'status': 'success',
+            'data': serializer_class(queryset.order_by('id'), many=True, fields=fields).data,
+            'next_cursor': None,
+        })
+        self.assertEqual(response.content, expected)
+
+    def test_list_endpoints_match_drf(self):
+        endpoints = [
+            ('students/list/', Student.objects.all(), StudentSerializer),
+            ('teachers/list/', Teacher.objects.all(), TeacherSerializer),
+            ('programs/list/', Program.objects.all(), ProgramSerializer),
+            ('timetable/list/', TimetableEntry.objects.all(), TimetableEntrySerializer),
+            ('attendance/list/', ScanEvent.objects.all(), ScanEventSerializer),
+        ]
+        for url, queryset, serializer_class in endpoints:
+            with self.subTest(url=url):
+                self.assertRendersLikeDrf(url, queryset, serializer_class)
+
+    def test_projected_lists_match_drf(self):
+        self.assertRendersLikeDrf('students/list/', Student.objects.all(), StudentSerializer, ['regNumber', 'hasRfid'])
+        self.assertRendersLikeDrf(
+            'timetable/list/', TimetableEntry.objects.all(), TimetableEntrySerializer, ['teacher_name', 'startTime']
+        )
+
+
+class SessionSaveDebounceTests(TestCase):
+    """Unchanged sessions rewrite their expiry at most once per SESSION_SAVE_INTERVAL."""
+
+    def setUp(self):
+        cache.clear()
+        session = SessionStore()
+        session['user_id'] = 1
+        session.save()
+        self.session_key = session.session_key
+
+    def writes(self, session):
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+        return [query['sql'] for query in queries if query['sql'].startswith(('UPDATE', 'INSERT'))]
+
+    def loaded(self):
+        session = SessionStore(self.session_key)
+        self.assertEqual(session['user_id'], 1)
+        return session
+
+    def test_unchanged_session_is_not_rewritten_within_the_interval(self):
+        self.assertEqual(self.writes(self.loaded()), [])
+
+    def test_unchanged_session_is_rewritten_after_the_interval(self):
+        cache.clear()  # the "recently written" marker expired
+        self.assertEqual(len(self.writes(self.loaded())), 1)
+        self.assertEqual(self.writes(self.loaded()), [])
+
+    def test_changes_are_always_saved(self):
+        session = self.loaded()
+        session['user_id'] = 2
+        self.assertEqual(len(self.writes(session)), 1)
+        self.assertEqual(SessionStore(self.session_key)['user_id'], 2)
+
+    def test_debounce_can_be_switched_off(self):
+        with mock.patch.object(sessions, 'SESSION_SAVE_INTERVAL', 0):
+            self.assertEqual(len(self.writes(self.loaded())), 1)
+
+
+class LoginThrottleTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User(name='Staff', email='staff@example.com')
+        cls.user.set_password('correct horse')
+        cls.user.save()
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, password, email='staff@example.com', ip='10.0.0.1'):
+        return self.client.post(
+            '/attendance_api/auth/login/',
+            json.dumps({'email': email, 'password': password}),
+            content_type='application/json',
+            REMOTE_ADDR=ip,
+        )
+
+    def test_successful_logins_are_not_throttled(self):
+        for _ in range(login_throttle.LOGIN_FAILURES_PER_IP + 5):
+            self.assertEqual(self.login('correct horse').status_code, 200)
+
+    def test_repeated_failures_are_throttled(self):
+        for _ in range(login_throttle.LOGIN_FAILURES_PER_IP_EMAIL):
+            self.assertEqual(self.login('wrong').status_code, 401)
+
+        response = self.login('correct horse')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], str(login_throttle.LOGIN_THROTTLE_WINDOW))
+        # Failures from one address don't lock the account out everywhere
+        self.assertEqual(self.login('correct horse', ip='10.0.0.2').status_code, 200)
+
+    def test_failures_across_emails_throttle_the_address(self):
+        for i in range(login_throttle.LOGIN_FAILURES_PER_IP):
+            self.assertEqual(self.login('wrong', email=f'guess{i}@example.com').status_code, 401)
+
+        self.assertEqual(self.login('correct horse').status_code, 429)
+        self.assertEqual(self.login('correct horse', ip='10.0.0.2').status_code, 200)
+
+    def test_window_expires(self):
+        for _ in range(login_throttle.LOGIN_FAILURES_PER_IP_EMAIL):
+            self.login('wrong')
+        self.assertEqual(self.login('correct horse').status_code, 429)
+
+        later = time.time() + login_throttle.LOGIN_THROTTLE_WINDOW + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(self.login('correct horse').status_code, 200)
+
+    def test_client_ip_from_trusted_proxy_header(self):
+        request = RequestFactory().post(
+            '/', REMOTE_ADDR='172.16.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7'
+        )
+        self.assertEqual(login_throttle.client_ip(request), '172.16.0.1')
+        with mock.patch.object(login_throttle, 'TRUSTED_PROXY_HEADER', 'HTTP_X_FORWARDED_FOR'):
+            # The left entry is whatever the client sent; the proxy appended the real address
+            self.assertEqual(login_throttle.client_ip(request), '203.0.113.7')
+
+
+# 2026-10-12 is a Monday; the session below runs 08:00-10:00 with a 10 minute grace
+MONDAY = '2026-10-12'
+
+
+class UserCacheTests(ApiTestCase):
+    """The signed-in user is served from the per-process cache until the User row changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User(name='Staff', email='staff@example.com', role=3)
+        cls.user.set_password('correct horse')
+        cls.user.save()
+
+    def setUp(self):
+        cache.clear()
+        user_cache.invalidate()
+        response = self.post('auth/login/', {'email': 'staff@example.com', 'password': 'correct horse'})
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def me(self):
+        return self.client.get('/attendance_api/auth/me/')
+
+    def test_cached_user_costs_no_query(self):
+        user_cache.get(self.user.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(user_cache.get(self.user.id).email, 'staff@example.com')
+
+    def test_role_change_is_seen_on_the_next_request(self):
+        self.assertEqual(self.me().json()['data']['role'], 3)
+        self.user.role = 1
+        self.user.save()
+        self.assertEqual(self.me().json()['data']['role'], 1)
+
+    def test_password_change_replaces_the_cached_user(self):
+        user_cache.get(self.user.id)
+        self.user.set_password('battery staple')
+        self.user.save()
+        self.assertTrue(user_cache.get(self.user.id).check_password('battery staple'))
+
+    def test_deactivated_user_is_signed_out(self):
+        self.assertEqual(self.me().status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.me().status_code, 404)
+
+
+class DeviceHeartbeatTests(ApiTestCase):
+
+    def setUp(self):
+        heartbeat_tracker.clear()
+        self.device = make_device()
+
+    def listed(self):
+        response = self.client.get('/attendance_api/devices/list/')
+        self.assertEqual(response.status_code, 200)
+        return {row['name']: row for row in response.json()['data']}
+
+    def test_only_heartbeats_make_a_device_online(self):
+        self.assertEqual(self.listed()['Lab reader']['status'], 'offline')
+        self.assertIsNone(self.listed()['Lab reader']['lastSeen'])
+
+        response = self.post('devices/update', {
+            'id': self.device.id, 'name': 'Renamed', 'status': 'online', 'lastSeen': '2026-10-12T08:00:00Z',
+        })
+        self.assertEqual(response.status_code, 200, response.content)
+        renamed = self.listed()['Renamed']
+        self.assertEqual(renamed['status'], 'offline')
+        self.assertIsNone(renamed['lastSeen'])
+
+        response = self.post('devices/heartbeat/', {'device_id': self.device.id})
+        self.assertEqual(response.json()['data']['accepted'], 1)
+        self.assertEqual(self.listed()['Renamed']['status'], 'online')
+
+    def test_flush_writes_heartbeats_and_expires_silent_devices(self):
+        silent = make_device('Silent', 'Lab 2', status='online')
+        heartbeat_tracker.beat([self.device.id])
+        heartbeat_tracker.flush()
+
+        statuses = dict(Device.objects.values_list('name', 'status'))
+        self.assertEqual(statuses, {'Lab reader': 'online', 'Silent': 'offline'})
+        self.assertIsNotNone(Device.objects.get(id=self.device.id).lastSeen)
+        self.assertIsNone(Device.objects.get(id=silent.id).lastSeen)
+
+
+class PasswordHashCostTests(TestCase):
+
+    def test_django_defaults_are_kept(self):
+        self.assertEqual(TunablePBKDF2PasswordHasher.iterations, PBKDF2PasswordHasher.iterations)
+        self.assertEqual(checks.check_password_hash_costs(None), [])
+
+    def test_lowered_cost_is_reported(self):
+        with mock.patch.object(TunablePBKDF2PasswordHasher, 'iterations', 1000):
+            warnings = checks.check_password_hash_costs(None)
+        self.assertEqual([warning.id for warning in warnings], ['attendance_api.W001'])
+        self.assertIn('PASSWORD_PBKDF2_ITERATIONS=1000', warnings[0].msg)
+
+
+class ScanIngestTests(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.device = make_device()
+        cls.program = make_program()
+        cls.course = make_course()
+        cls.teacher = make_teacher()
+        cls.entry = make_entry(cls.program, cls.course, cls.device, cls.teacher)
+        cls.students = make_students(2)
+        for i, student in enumerate(cls.students):
+            Credential.objects.create(type='rfid', uid=f'TAG-S{i}', student=student)
+        Credential.objects.create(type='rfid', uid='TAG-T', teacher=cls.teacher)
+
+    def setUp(self):
+        credential_index.invalidate()
+        timetable_index.invalidate()
+        swipe_deduper.clear()
+
+    def scan(self, tag, time_of_day, sequence=None):
+        event = {'device_id': self.device.id, 'tag_uid': tag, 'timestamp': f'{MONDAY}T{time_of_day}'}
+        if sequence is not None:
+            event['sequence'] = sequence
+        return event
+
+    def student_rollup(self, student):
+        return AttendanceRollup.objects.get(student=student, timetable_entry=self.entry)
+
+    def test_batch_accept_and_reject_counts(self):
+        response = self.post('scans/ingest/', [
+            self.scan('TAG-S0', '08:05:00'),
+            dict(self.scan('TAG-S1', '08:05:00'), device_id=999),
+            dict(self.scan('TAG-S1', '08:05:00'), tag_uid=' '),
+            dict(self.scan('TAG-S1', '08:05:00'), timestamp='yesterday'),
+            'not an event',
+            self.scan('UNKNOWN', '08:06:00'),
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual((data['accepted'], data['rejected']), (2, 4))
+        self.assertEqual([error['index'] for error in data['errors']], [1, 2, 3, 4])
+        stored = dict(ScanEvent.objects.values_list('tag_uid', 'student_id'))
+        self.assertEqual(stored, {'TAG-S0': self.students[0].id, 'UNKNOWN': None})
+
+    def test_repeat_reads_are_suppressed(self):
+        result = ingest_scan_events([
+            self.scan('TAG-S0', '08:05:00'),
+            self.scan('TAG-S0', '08:05:01'),
+            self.scan('TAG-S1', '08:05:01'),
+            self.scan('TAG-S0', '08:05:30'),
+        ])
+
+        self.assertEqual((result.accepted, result.duplicates), (3, 1))
+        self.assertEqual(self.student_rollup(self.students[0]).scan_count, 2)
+
+    def test_rollup_totals(self):
+        ingest_scan_events([
+            self.scan('TAG-T', '08:01:00'),
+            self.scan('TAG-S0', '08:05:00'),
+            self.scan('TAG-S1', '08:30:00'),
+            self.scan('TAG-S0', '08:40:00'),
+            self.scan('TAG-S0', '11:00:00'),  # after the session
+        ])
+
+        first = self.student_rollup(self.students[0])
+        self.assertEqual((first.status, first.scan_count), (AttendanceStatus.PRESENT, 2))
+        self.assertEqual(self.student_rollup(self.students[1]).status, AttendanceStatus.LATE)
+        session = SessionRollup.objects.get()
+        self.assertEqual(
+            (session.present_count, session.late_count, session.teacher_present), (1, 1, True)
+        )
+
+        # A backlog scan earlier than the recorded first one re-evaluates the status
+        ingest_scan_events([self.scan('TAG-S1', '08:02:00')])
+        self.assertEqual(self.student_rollup(self.students[1]).status, AttendanceStatus.PRESENT)
+        session.refresh_from_db()
+        self.assertEqual((session.present_count, session.late_count), (2, 0))
+
+    def test_replay_is_idempotent(self):
+        backlog = {
+            'device_id': self.device.id,
+            'events': [
+                {'tag_uid': 'TAG-S0', 'timestamp': f'{MONDAY}T08:05:00', 'sequence': 1},
+                {'tag_uid': 'TAG-S1', 'timestamp': f'{MONDAY}T08:30:00', 'sequence': 2},
+                {'tag_uid': 'TAG-S0', 'timestamp': f'{MONDAY}T08:45:00', 'sequence': 3},
+            ],
+        }
+        data = self.post('scans/replay/', backlog).json()['data']
+        self.assertEqual((data['accepted'], data['already_stored']), (3, 0))
+
+        swipe_deduper.clear()
+        data = self.post('scans/replay/', backlog).json()['data']
+        self.assertEqual((data['accepted'], data['already_stored']), (0, 3))
+
+        self.assertEqual(ScanEvent.objects.count(), 3)
+        self.assertEqual(self.student_rollup(self.students[0]).scan_count, 2)
+        session = SessionRollup.objects.get()
+        self.assertEqual((session.present_count, session.late_count), (1, 1))
+
+    def test_sequences_stored_concurrently_are_not_counted(self):
+        result = IngestResult()
+        events = build_scan_events(
+            [self.scan('TAG-S0', '08:05:00', sequence=7), self.scan('TAG-S1', '08:06:00', sequence=8)], result
+        )
+        # Another worker (with its own deduper) stores sequence 7 between validation and the write
+        swipe_deduper.clear()
+        ingest_scan_events([self.scan('TAG-S0', '08:05:00', sequence=7)])
+
+        _store(events, result)
+
+        self.assertEqual((result.accepted, result.already_stored), (1, 1))
+        self.assertEqual(ScanEvent.objects.count(), 2)
+        self.assertEqual(self.student_rollup(self.students[0]).scan_count, 1)
+        self.assertTrue(all(event.pk for event in events if event.sequence == 8))
+        self.assertEqual(SessionRollup.objects.get().present_count, 2)
+
+    def test_rollup_rows_created_concurrently_are_merged(self):
+        insert = AttendanceRollup.objects.bulk_create
+
+        def racing_insert(rows, **kwargs):
+            # Another worker creates the same rollup row after this batch looked for it
+            insert([AttendanceRollup(
+                date=MONDAY, timetable_entry=self.entry, course=self.course, student=self.students[0],
+                status=AttendanceStatus.PRESENT, scan_count=1,
+                first_scan_at=timezone.make_aware(datetime(2026, 10, 12, 8, 1)),
+            )])
+            return insert(rows, **kwargs)
+
+        with mock.patch.object(AttendanceRollup.objects, 'bulk_create', side_effect=racing_insert):
+            result = ingest_scan_events([self.scan('TAG-S0', '08:05:00')])
+
+        self.assertEqual(result.accepted, 1)
+        rollup = self.student_rollup(self.students[0])
+        self.assertEqual((rollup.scan_count, rollup.status), (2, AttendanceStatus.PRESENT))
+
+
+class LiveEventsTests(TestCase):
+    """Published events reach the SSE subscribers whose filters they match."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.device = make_device()
+        cls.other_device = make_device('Hall reader', 'Hall')
+        cls.program = make_program()
+        cls.course = make_course()
+        cls.entry = make_entry(cls.program, cls.course, cls.device)
+        cls.student = make_students(1)[0]
+        Credential.objects.create(type='rfid', uid='TAG-S0', student=cls.student)
+
+    def setUp(self):
+        credential_index.invalidate()
+        timetable_index.invalidate()
+        swipe_deduper.clear()
+
+    async def test_stream_delivers_matching_events(self):
+        response = await self.async_client.get(f'/attendance_api/live/events/?device={self.device.id}&types=scan')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        self.assertEqual(broadcaster.subscriber_count, 1)
+
+        # Ingest publishes from the sync worker thread
+        await asyncio.to_thread(broadcaster.publish, [
+            {'type': 'scan', 'device': self.other_device.id},
+            {'type': 'device', 'device': self.device.id, 'status': 'online'},
+            {'type': 'scan', 'device': self.device.id, 'tag_uid': 'TAG-S0'},
+        ])
+        message = await asyncio.wait_for(anext(stream), 1)
+        data = json.dumps({'type': 'scan', 'device': self.device.id, 'tag_uid': 'TAG-S0'}, separators=(',', ':'))
+        self.assertEqual(message, f'event: scan\ndata: {data}\n\n'.encode())
+
+        # The server cancels the pending read when the client disconnects
+        waiting = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(broadcaster.subscriber_count, 0)
+
+    def test_committed_scans_are_published_with_their_session(self):
+        loop = asyncio.new_event_loop()
+        subscription = broadcaster.subscribe(Subscription(loop, programs={self.program.id}))
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                ingest_scan_events([
+                    {'device_id': self.device.id, 'tag_uid': 'TAG-S0', 'timestamp': f'{MONDAY}T08:05:00'},
+                    # Outside every session, so it carries no program
+                    {'device_id': self.device.id, 'tag_uid': 'TAG-S0', 'timestamp': f'{MONDAY}T12:00:00'},
+                ])
+            loop.run_until_complete(asyncio.sleep(0))
+        finally:
+            broadcaster.unsubscribe(subscription)
+            loop.close()
+
+        self.assertEqual(subscription.queue.qsize(), 1)
+        event, data = subscription.queue.get_nowait().split('\n')[:2]
+        self.assertEqual(event, 'event: scan')
+        scan = json.loads(data.removeprefix('data: '))
+        self.assertEqual(
+            (scan['student'], scan['timetable_entry'], scan['course'], scan['status']),
+            (self.student.id, self.entry.id, self.course.id, 'present'),
+        )
+
+
+class AsyncScanWriterTests(TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def fake_ingest(self, events):
+        tags = [event['tag'] for event in events]
+        self.calls.append(tags)
+        if 'BAD' in tags:
+            raise IntegrityError('refused')
+        result = IngestResult()
+        result.accepted = len(events)
+        return result
+
+    async def drain(self, writer, *submissions):
+        with mock.patch.object(async_ingest, 'ingest_scan_events', self.fake_ingest):
+            for tags in submissions:
+                self.assertTrue(writer.submit([{'tag': tag} for tag in tags]))
+            while writer.pending:
+                await asyncio.sleep(0.01)
+        writer._task.cancel()
+        try:
+            await writer._task
+        except asyncio.CancelledError:
+            pass
+
+    async def test_submissions_are_merged_up_to_the_batch_size(self):
+        writer = async_ingest.AsyncScanWriter(batch_size=3, flush_interval=0.05)
+        await self.drain(writer, ['A1', 'A2'], ['B1', 'B2'], ['C1'])
+
+        self.assertEqual(self.calls, [['A1', 'A2', 'B1', 'B2'], ['C1']])
+        self.assertEqual((writer.written, writer.failed, writer.batches), (5, 0, 2))
+
+    async def test_a_failing_submission_does_not_fail_the_others(self):
+        writer = async_ingest.AsyncScanWriter(batch_size=100, flush_interval=0.05)
+        with self.assertLogs('attendance_api.async_ingest', 'WARNING') as logs:
+            await self.drain(writer, ['A1', 'A2'], ['BAD'], ['C1'])
+
+        self.assertEqual(len(logs.records), 2)
+
+        self.assertEqual(self.calls, [['A1', 'A2', 'BAD', 'C1'], ['A1', 'A2'], ['BAD'], ['C1']])
+        self.assertEqual((writer.written, writer.failed, writer.pending), (3, 1, 0))
+
+
+class ArchiveScansTests(TestCase):
+    """archive_scans moves closed months to NDJSON files that hold exactly the rows it deletes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        device = make_device()
+        student = make_students(1)[0]
+        for moment in (datetime(2025, 1, 6, 8, 0), datetime(2025, 1, 31, 23, 0), datetime(2025, 2, 3, 8, 0)):
+            moment = timezone.make_aware(moment)
+            ScanEvent.objects.create(
+                device=device, tag_uid='TAG-S0', student=student, timestamp=moment,
+                period=partitions.period_of(moment),
+            )
+        now = timezone.now()
+        cls.live = ScanEvent.objects.create(
+            device=device, tag_uid='TAG-S0', timestamp=now, period=partitions.period_of(now)
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def archive(self):
+        call_command('archive_scans', directory=self.directory, stdout=io.StringIO())
+
+    def test_round_trip(self):
+        expected = {
+            period: ScanEventSerializer(ScanEvent.objects.filter(period=period).order_by('id'), many=True).data
+            for period in (202501, 202502)
+        }
+        self.archive()
+
+        self.assertEqual(list(ScanEvent.objects.values_list('id', flat=True)), [self.live.id])
+        for partition in ArchivedPartition.objects.order_by('period'):
+            with gzip.open(partition.path, 'rt', encoding='utf-8') as handle:
+                rows = [json.loads(line) for line in handle]
+            self.assertEqual(rows, expected[partition.period])
+            self.assertEqual(partition.row_count, len(rows))
+            with open(partition.path, 'rb') as handle:
+                self.assertEqual(partition.sha256, hashlib.sha256(handle.read()).hexdigest())
+
+        self.assertEqual(partitions.partition_summary()['archived'], [
+            {'period': 202501, 'rows': 2, 'files': 1, 'size_bytes': mock.ANY},
+            {'period': 202502, 'rows': 1, 'files': 1, 'size_bytes': mock.ANY},
+        ])
+
+    def test_interrupted_archive_is_finished_without_a_second_file(self):
+        with mock.patch.object(partitions, '_delete_range', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                partitions.archive_period(202501, self.directory)
+        self.assertEqual(ScanEvent.objects.filter(period=202501).count(), 2)
+
+        self.assertIsNone(partitions.archive_period(202501, self.directory))
+        self.assertFalse(ScanEvent.objects.filter(period=202501).exists())
+        self.assertEqual(ArchivedPartition.objects.get().row_count, 2)
+
+
+class CredentialFieldsTests(ApiTestCase):
+    """rfidUid/fingerprintId on the student endpoints keep Credential rows and has* flags in step."""
+
+    def create_student(self, **credentials):
+        return self.post('students/create/', dict(name='S', regNumber='R1', program='CS', year=1, **credentials))
+
+    def test_create_rejects_the_same_uid_for_both_credentials(self):
+        response = self.create_student(rfidUid='UID-1', fingerprintId='UID-1')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn('fingerprintId', response.json()['message'])
+        self.assertFalse(Student.objects.exists())
+        self.assertFalse(Credential.objects.exists())
+
+    def test_update_rejects_the_persons_other_credential_uid(self):
+        response = self.create_student(rfidUid='TAG-1', fingerprintId='FP-1')
+        self.assertEqual(response.status_code, 201, response.content)
+        student = Student.objects.get()
+
+        response = self.post('students/update/', {'id': student.id, 'rfidUid': 'FP-1'})
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn('rfidUid', response.json()['message'])
+        self.assertEqual(
+            dict(Credential.objects.values_list('type', 'uid')), {'rfid': 'TAG-1', 'fingerprint': 'FP-1'}
+        )
+
+        # Re-sending a credential the person already holds is not a clash
+        response = self.post('students/update/', {'id': student.id, 'rfidUid': 'TAG-1', 'name': 'S2'})
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_person_and_credentials_are_saved_together(self):
+        Credential.objects.create(
+            type='rfid', uid='TAG-1',
+            student=Student.objects.create(name='Other', regNumber='R0', program='CS', year=1),
+        )
+        with mock.patch.object(Credential.objects, 'update_or_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                StudentSerializer().create({
+                    'name': 'S', 'regNumber': 'R1', 'program': 'CS', 'year': 1, 'rfidUid': 'TAG-2',
+                })
+        self.assertFalse(Student.objects.filter(regNumber='R1').exists())
+
+
+class ExportTests(TestCase):
+    """Exports stream the same values the list endpoints return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        make_students(3)
+        Student.objects.filter(regNumber='R1').update(hasRfid=True)
+
+    def listed_students(self):
+        return self.client.get('/attendance_api/students/list/').json()['data']
+
+    def test_ndjson_rows_match_the_list_endpoint(self):
+        response = self.client.get('/attendance_api/students/export/?output=ndjson')
+        self.assertFalse(response.is_async)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        by_id = lambda row: row['id']
+        self.assertEqual(sorted(rows, key=by_id), sorted(self.listed_students(), key=by_id))
+
+    def test_csv_cells_match_the_list_endpoint(self):
+        response = self.client.get('/attendance_api/students/export/')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        header = lines[0].split(',')
+        listed = {row['id']: row for row in self.listed_students()}
+        for line in lines[1:]:
+            row = dict(zip(header, line.split(',')))
+            self.assertEqual(row, {name: str(value) for name, value in listed[row['id']].items()})
+
+    async def test_asgi_export_is_streamed_asynchronously(self):
+        response = await self.async_client.get('/attendance_api/students/export/?output=ndjson')
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.decode().splitlines()), 3)
+
+
+class RosterImportTests(TestCase):
+
+    def upload(self, text, roster='students'):
+        upload = SimpleUploadedFile('roster.csv', text.encode(), content_type='text/csv')
+        response = self.client.post(f'/attendance_api/{roster}/import/', {'file': upload})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['data']
+
+    def test_upserts_on_the_roster_key_and_reports_bad_rows(self):
+        Student.objects.create(name='Old name', regNumber='R1', program='CS', year=1)
+        report = self.upload(
+            'name,regNumber,program,year\n'
+            'New name,R1,CS,2\n'
+            'Fresh,R2,CS,1\n'
+            ',R3,CS,1\n'
+            'Bad year,R4,CS,two\n'
+            'Again,R2,CS,1\n'
+        )
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(report['updated'], 1)
+        self.assertEqual(report['rejected'], 3)
+        self.assertEqual([error['row'] for error in report['errors']], [4, 5, 6])
+        self.assertEqual(set(report['errors'][0]['errors']), {'name'})
+        self.assertEqual(set(report['errors'][1]['errors']), {'year'})
+        self.assertIn('row 3', report['errors'][2]['errors']['regNumber'])
+        self.assertEqual(
+            list(Student.objects.order_by('regNumber').values_list('regNumber', 'name', 'year')),
+            [('R1', 'New name', 2), ('R2', 'Fresh', 1)],
+        )
+
+    def test_database_errors_only_reject_the_rows_involved(self):
+        bulk_create = Student.objects.bulk_create
+
+        def refuse_bad_rows(objs, **kwargs):
+            if any(obj.name == 'Refused' for obj in objs):
+                raise IntegrityError('refused')
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(Student.objects, 'bulk_create', side_effect=refuse_bad_rows):
+            report = self.upload(
+                'name,regNumber,program,year\n'
+                'A,R1,CS,1\n'
+                'Refused,R2,CS,1\n'
+                'C,R3,CS,1\n'
+            )
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(report['rejected'], 1)
+        self.assertEqual(report['errors'][0]['row'], 3)
+        self.assertEqual(sorted(Student.objects.values_list('regNumber', flat=True)), ['R1', 'R3'])
+
+    def test_credential_flags_are_not_imported(self):
+        report = self.upload('name,regNumber,program,year,hasRfid\nA,R1,CS,1,1\n')
+        self.assertEqual(report['created'], 1)
+        self.assertFalse(Student.objects.get().hasRfid)
+
+
+class SharedIndexTests(TestCase):
+    """Changes saved by one worker reach the process-local indexes of the others."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.device = make_device()
+        cls.program = make_program()
+        cls.course = make_course()
+        cls.students = make_students(2)
+
+    def setUp(self):
+        cache.clear()
+        credential_index.invalidate()
+        timetable_index.invalidate()
+        # Another worker's copies, already loaded before the changes below
+        self.other_credentials = CredentialIndex()
+        self.other_timetable = TimetableIndex()
+
+    def test_credential_changed_elsewhere_is_seen_after_the_check_interval(self):
+        self.other_credentials.generation.check_interval = 60
+        credential = Credential.objects.create(type='rfid', uid='TAG-0', student=self.students[0])
+        self.assertEqual(self.other_credentials.resolve('TAG-0'), (self.students[0].id, None))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            credential.student = self.students[1]
+            credential.save()
+            Credential.objects.create(type='rfid', uid='TAG-NEW', student=self.students[0])
+        self.assertEqual(self.other_credentials.resolve('TAG-0'), (self.students[0].id, None))
+        self.assertIsNone(self.other_credentials.resolve('TAG-NEW'))
+
+        self.other_credentials.generation.check_interval = 0
+        self.assertEqual(self.other_credentials.resolve('TAG-0'), (self.students[1].id, None))
+        self.assertEqual(self.other_credentials.resolve('TAG-NEW'), (self.students[0].id, None))
+
+    def test_unknown_tags_do_not_query_the_shared_cache(self):
+        self.other_credentials.generation.check_interval = 60
+        self.other_credentials.resolve('TAG-0')
+        with mock.patch('attendance_api.index_generation.cache.get') as shared_get:
+            for i in range(100):
+                self.assertIsNone(self.other_credentials.resolve(f'UNKNOWN-{i}'))
+        shared_get.assert_not_called()
+
+    def test_writing_worker_sees_its_change_once_committed(self):
+        self.assertIsNone(credential_index.resolve('TAG-NEW'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Credential.objects.create(type='rfid', uid='TAG-NEW', student=self.students[0])
+            self.assertIsNone(credential_index.resolve('TAG-NEW'))
+        self.assertEqual(credential_index.resolve('TAG-NEW'), (self.students[0].id, None))
+
+    def test_rolled_back_changes_are_not_announced(self):
+        self.assertIsNone(credential_index.resolve('TAG-NEW'))
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Credential.objects.create(type='rfid', uid='TAG-NEW', student=self.students[0])
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertIsNone(credential_index.resolve('TAG-NEW'))
+        self.assertIsNone(credential_index.generation.current())
+
+    def test_session_scheduled_elsewhere_is_seen_after_the_check_interval(self):
+        monday_nine = datetime(2026, 10, 12, 9, 0)
+        self.other_timetable.generation.check_interval = 60
+        self.assertIsNone(self.other_timetable.active_session(self.device.id, monday_nine))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = make_entry(self.program, self.course, self.device)
+        self.assertIsNone(self.other_timetable.active_session(self.device.id, monday_nine))
+        # The writing process drops its own copy on commit
+        self.assertEqual(timetable_index.active_session(self.device.id, monday_nine)[0], entry.id)
+
+        self.other_timetable.generation.check_interval = 0
+        session = self.other_timetable.active_session(self.device.id, monday_nine)
+        self.assertEqual(session[0], entry.id)
+        self.assertEqual(self.other_timetable.entry_info(entry.id), (self.program.id, self.course.id))
+
+
+class StatsCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        stats_cache.invalidate()
+        self.other_worker = StatsCache()
+        self.other_worker.generation.check_interval = 60
+
+    def stats(self):
+        response = self.client.get('/attendance_api/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def test_counts_follow_committed_changes_on_every_worker(self):
+        self.assertEqual(self.stats()['students'], 0)
+        self.assertEqual(self.other_worker.snapshot()['students'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Student.objects.create(name='S', regNumber='R1', program='CS', year=1)
+        self.assertEqual(self.stats()['students'], 1)
+        self.assertEqual(self.other_worker.snapshot()['students'], 0)
+        self.other_worker.generation.check_interval = 0
+        self.assertEqual(self.other_worker.snapshot()['students'], 1)
+
+    def test_unchanged_counts_cost_no_queries(self):
+        self.stats()
+        with self.assertNumQueries(0):
+            stats_cache.snapshot()
+
+
+class MetricsTests(TestCase):
+    """/metrics reports each route's requests, latency, queries and response size."""
+
+    ROUTE = 'route="attendance_api/students/list/",method="GET"'
+
+    @classmethod
+    def setUpTestData(cls):
+        make_students(2)
+
+    def setUp(self):
+        request_metrics.clear()
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith('#'):
+                series, value = line.rsplit(' ', 1)
+                samples[series] = float(value)
+        return samples
+
+    def test_requests_are_reported_per_route(self):
+        for _ in range(2):
+            self.client.get('/attendance_api/students/list/')
+        self.client.get('/attendance_api/nowhere/')
+        samples = self.scrape()
+
+        self.assertEqual(samples[f'attendance_http_requests_total{{{self.ROUTE},status="200"}}'], 2)
+        self.assertEqual(
+            samples['attendance_http_requests_total{route="<unmatched>",method="GET",status="404"}'], 1
+        )
+        # The fast list path is one SELECT
+        self.assertEqual(samples[f'attendance_http_request_db_queries_bucket{{{self.ROUTE},le="1"}}'], 2)
+        self.assertEqual(samples[f'attendance_http_request_db_queries_sum{{{self.ROUTE}}}'], 2)
+        self.assertEqual(samples[f'attendance_http_request_duration_seconds_count{{{self.ROUTE}}}'], 2)
+        self.assertEqual(samples[f'attendance_http_request_duration_seconds_bucket{{{self.ROUTE},le="+Inf"}}'], 2)
+        size = len(self.client.get('/attendance_api/students/list/').content)
+        self.assertEqual(samples[f'attendance_http_response_size_bytes_sum{{{self.ROUTE}}}'], 2 * size)
+
+    def test_requests_over_the_query_budget_are_counted_and_logged(self):
+        with mock.patch.object(middleware, 'METRICS_QUERY_BUDGET', 0):
+            with self.assertLogs('attendance_api.middleware', 'WARNING') as logs:
+                self.client.get('/attendance_api/students/list/')
+        self.assertIn('attendance_api/students/list/ ran 1 queries', logs.output[0])
+        samples = self.scrape()
+        self.assertEqual(samples[f'attendance_http_query_budget_exceeded_total{{{self.ROUTE}}}'], 1)
+
+
+class ExplainPlanTests(TestCase):
+
+    def test_sqlite_full_scans(self):
+        plan = (
+            'SCAN attendance_api_scanevent\n'
+            'SCAN attendance_api_device USING INDEX attendance__status_idx\n'
+            'SCAN attendance_api_student USING COVERING INDEX attendance__program_idx\n'
+            'SEARCH attendance_api_teacher USING INTEGER PRIMARY KEY (rowid=?)'
+        )
+        self.assertEqual(full_scans(plan, 'sqlite'), ['attendance_api_scanevent'])
+        self.assertEqual(full_scans('SCAN attendance_api_scanevent USING INDEX foo', 'sqlite'), [])
+
+    def test_postgresql_full_scans(self):
+        plan = (
+            'Hash Join\n'
+            '  ->  Seq Scan on attendance_api_scanevent\n'
+            '  ->  Index Scan using attendance__device_idx on attendance_api_device'
+        )
+        self.assertEqual(full_scans(plan, 'postgresql'), ['attendance_api_scanevent'])
+
+
+class TimetableConflictTests(ApiTestCase):
+    """Create, bulk create and validate reject double-booked teachers, venues and program years."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.programs = [make_program(f'P{i}', f'Program {i}') for i in range(2)]
+        cls.course = make_course()
+        cls.teachers = [make_teacher(f'T{i}', f't{i}@example.com') for i in range(2)]
+        cls.devices = [make_device(f'Reader {i}', f'Lab {i}') for i in range(2)]
+        cls.entry = make_entry(cls.programs[0], cls.course, cls.devices[0], cls.teachers[0], location='Lab 0')
+
+    def setUp(self):
+        timetable_index.invalidate()
+
+    def payload(self, **overrides):
+        """An entry that shares nothing with the stored one unless overridden."""
+        data = {
+            'program': self.programs[1].id, 'course': self.course.id, 'teacher': self.teachers[1].id,
+            'device': self.devices[1].id, 'location': 'Lab 1', 'year': 1, 'day': 'Monday',
+            'startTime': '09:00', 'endTime': '11:00', 'qualification': 'Diploma',
+        }
+        data.update(overrides)
+        return data
+
+    def conflict_resources(self, response):
+        self.assertEqual(response.status_code, 400, response.content)
+        return sorted(conflict['resource'] for conflict in response.json()['message']['conflicts'])
+
+    def test_create_rejects_overlapping_venue(self):
+        response = self.post('timetable/create/', self.payload(location='  LAB 0 '))
+        self.assertEqual(self.conflict_resources(response), ['location'])
+
+    def test_create_rejects_overlapping_teacher(self):
+        response = self.post('timetable/create/', self.payload(teacher=self.teachers[0].id))
+        self.assertEqual(self.conflict_resources(response), ['teacher'])
+
+    def test_create_allows_parallel_sessions_of_one_program_year(self):
+        # Electives and lab groups of one cohort run side by side
+        response = self.post('timetable/create/', self.payload(program=self.programs[0].id))
+        self.assertEqual(response.status_code, 201, response.content)
+
+    @mock.patch.object(timetable_conflicts, 'TIMETABLE_PROGRAM_YEAR_CLASHES', True)
+    def test_create_rejects_overlapping_program_year_when_enabled(self):
+        response = self.post('timetable/create/', self.payload(program=self.programs[0].id))
+        self.assertEqual(self.conflict_resources(response), ['program'])
+
+        # The same program's other year group is free at that time
+        response = self.post('timetable/create/', self.payload(program=self.programs[0].id, year=2))
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_create_allows_back_to_back_sessions(self):
+        response = self.post('timetable/create/', self.payload(
+            program=self.programs[0].id, teacher=self.teachers[0].id, device=self.devices[0].id,
+            location='Lab 0', startTime='10:00', endTime='12:00',
+        ))
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(TimetableEntry.objects.count(), 2)
+
+    def test_update_does_not_clash_with_itself(self):
+        response = self.post('timetable/update/', {'id': self.entry.id, 'endTime': '10:30'})
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_bulk_create_rejects_clashes_with_stored_entries(self):
+        # Back to back with each other, so only the clashes with the stored entry remain
+        response = self.post('timetable/bulk-create/', [
+            self.payload(location='Lab 0', startTime='08:00', endTime='08:30'),
+            self.payload(teacher=self.teachers[0].id, startTime='08:30', endTime='09:00'),
+            self.payload(program=self.programs[0].id, startTime='09:00', endTime='09:30'),
+        ])
+        self.assertEqual(self.conflict_resources(response), ['location', 'teacher'])
+        self.assertEqual(TimetableEntry.objects.count(), 1)
+
+        with mock.patch.object(timetable_conflicts, 'TIMETABLE_PROGRAM_YEAR_CLASHES', True):
+            response = self.post('timetable/bulk-create/', [
+                self.payload(program=self.programs[0].id, startTime='09:00', endTime='09:30'),
+            ])
+        self.assertEqual(self.conflict_resources(response), ['program'])
+
+    def test_bulk_create_rejects_clashes_within_the_batch(self):
+        response = self.post('timetable/bulk-create/', [
+            self.payload(startTime='13:00', endTime='15:00'),
+            self.payload(location='Lab 2', device=None, program=self.programs[0].id, startTime='14:00', endTime='16:00'),
+        ])
+        self.assertEqual(self.conflict_resources(response), ['teacher'])
+        self.assertEqual(response.json()['message']['conflicts'][0]['entries'], ['new-0', 'new-1'])
+
+    def test_bulk_create_allows_back_to_back_sessions(self):
+        response = self.post('timetable/bulk-create/', [
+            self.payload(
+                program=self.programs[0].id, teacher=self.teachers[0].id, device=self.devices[0].id,
+                location='Lab 0', startTime='10:00', endTime='12:00',
+            ),
+            self.payload(startTime='12:00', endTime='13:00'),
+            self.payload(startTime='13:00', endTime='14:00'),
+        ])
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(TimetableEntry.objects.count(), 4)
+
+    def test_bulk_create_costs_the_same_queries_for_any_batch_size(self):
+        days = [day for day, _ in TimetableEntry.DAY_CHOICES]
+        for count in (2, 40):
+            entries = [
+                self.payload(day=days[i % 7], startTime=f'{12 + i // 7}:00', endTime=f'{13 + i // 7}:00')
+                for i in range(count)
+            ]
+            TimetableEntry.objects.exclude(id=self.entry.id).delete()
+            # One in_bulk per related model, the conflict check, the insert (in a
+            # savepoint) and the created entries reloaded with their relations
+            with self.assertNumQueries(9):
+                response = self.post('timetable/bulk-create/', entries)
+
+            self.assertEqual(response.status_code, 201, response.content)
+            self.assertEqual(len(response.json()['data']), count)
+
+    def test_conflict_check_costs_one_query_for_any_batch_size(self):
+        for count in (2, 40):
+            candidates = [
+                {
+                    'id': f'new-{i}', 'day': 'Monday', 'startTime': dtime(8 + i % 10),
+                    'endTime': dtime(9 + i % 10),
+                    'teacher_id': self.teachers[i % 2].id, 'device_id': None, 'location': f'Room {i}',
+                    'program_id': self.programs[0].id, 'year': 1,
+                }
+                for i in range(count)
+            ]
+            with self.assertNumQueries(1):
+                conflicts = timetable_conflicts.check_conflicts(candidates)
+            self.assertTrue(conflicts)
+
+    def test_validate_reports_stored_clashes(self):
+        make_entry(self.programs[0], self.course, self.devices[1], self.teachers[0], startTime='09:30', endTime='10:30')
+        response = self.client.get('/attendance_api/timetable/validate/')
+        self.assertEqual(response.status_code, 200)
+        conflicts = response.json()['data']['conflicts']
+        self.assertEqual([conflict['resource'] for conflict in conflicts], ['teacher'])
+        self.assertEqual(conflicts[0]['start'], '09:30:00')
+        self.assertEqual(conflicts[0]['end'], '10:00:00')
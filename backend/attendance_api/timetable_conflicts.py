@@ -0,0 +1,138 @@
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import TimetableEntry
+
+TIMETABLE_PROGRAM_YEAR_CLASHES = getattr(settings, 'TIMETABLE_PROGRAM_YEAR_CLASHES', False)
+
+ENTRY_COLUMNS = (
+    'id', 'day', 'startTime', 'endTime', 'teacher_id', 'device_id', 'location', 'program_id', 'year',
+)
+
+
+def _time(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _resource_keys(entry):
+    location = (entry['location'] or '').strip().lower()
+    keys = {
+        'teacher': entry['teacher_id'],
+        'device': entry['device_id'],
+        'location': location or None,
+    }
+    if TIMETABLE_PROGRAM_YEAR_CLASHES and entry['program_id'] is not None:
+        keys['program'] = f"{entry['program_id']}/{entry['year']}"
+    return keys
+
+
+def find_conflicts(entries):
+    """Return every pair of entries that double-books a teacher, device or location.
+
+    With TIMETABLE_PROGRAM_YEAR_CLASHES a program's year group is checked too.
+
+    ``entries`` are dicts with the ENTRY_COLUMNS keys (``id`` may be any label).
+    Entries are grouped per resource and day, sorted by start time and swept
+    once while a heap holds the sessions still running, so the cost is
+    O(n log n) plus the number of clashes reported. Touching intervals
+    (one ends exactly when the next starts) are not conflicts.
+    """
+    groups = defaultdict(list)
+    for entry in entries:
+        for resource, value in _resource_keys(entry).items():
+            if value is not None:
+                groups[(resource, value, entry['day'])].append(entry)
+
+    conflicts = []
+    for (resource, value, day), group in groups.items():
+        if len(group) < 2:
+            continue
+        group.sort(key=lambda entry: (entry['startTime'], entry['endTime']))
+        running = []
+        for order, entry in enumerate(group):
+            start = entry['startTime']
+            while running and running[0][0] <= start:
+                heapq.heappop(running)
+            for end, _, other in running:
+                conflicts.append({
+                    'resource': resource,
+                    'value': value,
+                    'day': day,
+                    'entries': [str(other['id']), str(entry['id'])],
+                    'start': _time(start),
+                    'end': _time(min(end, entry['endTime'])),
+                })
+            heapq.heappush(running, (entry['endTime'], order, entry))
+
+    return conflicts
+
+
+def check_conflicts(candidates, exclude_ids=()):
+    """Clashes between ``candidates`` and each other or the stored timetable.
+
+    Loads only the stored entries that share a day and a resource with some
+    candidate (one query), excluding ``exclude_ids`` (entries being replaced).
+    Only conflicts that involve at least one candidate are returned.
+    """
+    if not candidates:
+        return []
+
+    days, teachers, devices, locations = set(), set(), set(), set()
+    programs, years = set(), set()
+    for candidate in candidates:
+        keys = _resource_keys(candidate)
+        days.add(candidate['day'])
+        if keys['teacher'] is not None:
+            teachers.add(keys['teacher'])
+        if keys['device'] is not None:
+            devices.add(keys['device'])
+        if keys['location'] is not None:
+            locations.add(keys['location'])
+        if 'program' in keys:
+            programs.add(candidate['program_id'])
+            years.add(candidate['year'])
+
+    # Set-based prefilter; the sweep below discards rows that only match loosely
+    same_resource = (
+        Q(teacher_id__in=teachers) | Q(device_id__in=devices) | Q(location_lc__in=locations)
+    )
+    if programs:
+        same_resource |= Q(program_id__in=programs, year__in=years)
+    stored = list(
+        TimetableEntry.objects.filter(same_resource, day__in=days)
+        .exclude(id__in=exclude_ids)
+        .values(*ENTRY_COLUMNS)
+    )
+
+    candidate_ids = {str(candidate['id']) for candidate in candidates}
+    return [
+        conflict for conflict in find_conflicts(stored + list(candidates))
+        if candidate_ids.intersection(conflict['entries'])
+    ]
+
+
+def candidate_from_data(data, label, instance=None):
+    """Build a conflict-check row from validated serializer data (merged over ``instance``)."""
+
+    def pick(name):
+        if name in data:
+            return data[name]
+        return getattr(instance, name, None) if instance is not None else None
+
+    program = pick('program')
+    teacher = pick('teacher')
+    device = pick('device')
+    return {
+        'id': instance.pk if instance is not None else label,
+        'day': pick('day'),
+        'startTime': pick('startTime'),
+        'endTime': pick('endTime'),
+        'teacher_id': teacher.pk if teacher is not None else None,
+        'device_id': device.pk if device is not None else None,
+        'location': pick('location'),
+        'program_id': program.pk if program is not None else None,
+        'year': pick('year'),
+    }
@@ -0,0 +1,137 @@
+import threading
+import time
+from bisect import bisect_right
+
+from django.conf import settings
+from django.utils import timezone
+
+from .index_generation import IndexGeneration
+from .models import TimetableEntry
+
+# Other workers' changes arrive through the shared generation; the periodic
+# reload only catches writes that bypass changed(), such as QuerySet.update()
+TIMETABLE_INDEX_TTL = getattr(settings, 'TIMETABLE_INDEX_TTL', 300)
+
+# TimetableEntry.day stores the weekday name; position matches date.weekday()
+DAY_NAMES = [day for day, _ in TimetableEntry.DAY_CHOICES]
+DAY_NUMBERS = {day: number for number, day in enumerate(DAY_NAMES)}
+
+
+class _DayBucket:
+    """Sessions of one device on one weekday, sorted by start time once loaded.
+
+    ``max_end[i]`` is the latest end time among the first i + 1 sessions, which
+    lets a lookup stop walking back as soon as nothing earlier can still be
+    running, even if sessions overlap.
+    """
+
+    __slots__ = ('sessions', 'starts', 'max_end')
+
+    def __init__(self):
+        self.sessions = []
+        self.starts = []
+        self.max_end = []
+
+    def add(self, start, end, entry_id):
+        self.sessions.append((start, end, entry_id))
+
+    def seal(self):
+        self.sessions.sort()
+        self.starts = [session[0] for session in self.sessions]
+        self.max_end = []
+        latest = None
+        for _, end, _ in self.sessions:
+            latest = end if latest is None or end > latest else latest
+            self.max_end.append(latest)
+
+    def find(self, moment):
+        i = bisect_right(self.starts, moment) - 1
+        while i >= 0 and self.max_end[i] > moment:
+            session = self.sessions[i]
+            if session[1] > moment:
+                return session
+            i -= 1
+        return None
+
+
+class TimetableIndex:
+    """Process-local (device, weekday) -> sorted sessions index.
+
+    Answers "which TimetableEntry is running on this device right now" with a
+    bisect over start times. Timetable writes call changed() (the signals do,
+    and bulk inserts, which bypass them, do so explicitly): once the
+    transaction commits this process drops its copy and every other worker
+    sees the shared generation move within its check interval.
+    """
+
+    def __init__(self, ttl=TIMETABLE_INDEX_TTL):
+        self.ttl = ttl
+        self.generation = IndexGeneration('timetable_index')
+        self._lock = threading.Lock()
+        self._buckets = None
+        self._entries = {}
+        self._loaded_at = 0.0
+
+    def _load(self):
+        # Read before the rows, so a change committed mid-load triggers another reload
+        generation = self.generation.current()
+        buckets = {}
+        entries = {}
+        rows = TimetableEntry.objects.filter(device__isnull=False).values_list(
+            'id', 'device_id', 'day', 'startTime', 'endTime', 'program_id', 'course_id'
+        )
+        for entry_id, device_id, day, start, end, program_id, course_id in rows.iterator(chunk_size=5000):
+            weekday = DAY_NUMBERS.get(day)
+            if weekday is None:
+                continue
+            key = (device_id, weekday)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = _DayBucket()
+            bucket.add(start, end, entry_id)
+            entries[entry_id] = (program_id, course_id)
+        for bucket in buckets.values():
+            bucket.seal()
+        self._buckets = buckets
+        self._entries = entries
+        self._loaded_at = time.monotonic()
+        self.generation.loaded(generation)
+
+    def _expired(self):
+        return self._buckets is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def _ensure_loaded(self):
+        if self._expired() or self.generation.changed():
+            with self._lock:
+                if self._expired() or self.generation.changed(force=True):
+                    self._load()
+        return self._buckets
+
+    def active_session(self, device_id, local):
+        """Return (entry_id, start_time) of the entry running on ``device_id`` at ``local`` (local time)."""
+        bucket = self._ensure_loaded().get((device_id, local.weekday()))
+        if bucket is None:
+            return None
+        session = bucket.find(local.time())
+        return (session[2], session[0]) if session is not None else None
+
+    def active_entry(self, device_id, when):
+        """Return the id of the entry running on ``device_id`` at ``when`` (aware datetime)."""
+        session = self.active_session(device_id, timezone.localtime(when))
+        return session[0] if session is not None else None
+
+    def entry_info(self, entry_id):
+        """Return (program_id, course_id) of an indexed entry, or None."""
+        self._ensure_loaded()
+        return self._entries.get(entry_id)
+
+    def changed(self):
+        self.generation.bump(then=self.invalidate)
+
+    def invalidate(self):
+        with self._lock:
+            self._buckets = None
+            self._entries = {}
+
+
+timetable_index = TimetableIndex()
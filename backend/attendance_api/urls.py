@@ -6,11 +6,18 @@ from .old_views import (
     CreateProgramView, UpdateProgramView, ProgramListView, DeleteProgramView, BulkDeleteProgramView,
     CourseListView, CreateCourseView, UpdateCourseView, DeleteCourseView, BulkDeleteCourseView,
     TimetableEntryListView, CreateTimetableEntryView, UpdateTimetableEntryView, DeleteTimetableEntryView,
-    BulkDeleteTimetableEntryView, BulkCreateTimetableEntryView, StatsView
+    BulkDeleteTimetableEntryView, BulkCreateTimetableEntryView, ValidateTimetableView, StatsView
 )
 from .views.auth_views import (
     LogoutView, LoginView, GetCurrentUserView, CheckAuthView
 )
+from .views.scan_views import ScanIngestView, ScanReplayView, DeviceHeartbeatView, ScanDedupStatsView
+from .views.import_views import StudentImportView, TeacherImportView
+from .views.export_views import StudentExportView, TeacherExportView, TimetableExportView, AttendanceExportView
+from .views.async_scan_views import AsyncScanIngestView
+from .views.live_views import LiveEventsView, LiveStatsView
+from .views.attendance_views import AttendanceListView, ScanPartitionsView
+from .views.report_views import ProgramReportView, StudentReportView
 
 urlpatterns = [
     #AUTHENTICATION
@@ -25,6 +32,8 @@ urlpatterns = [
     path('students/update/', UpdateStudentView.as_view(), name='update_student'),
     path('students/delete/', DeleteStudentView.as_view(), name='delete_student'),
     path('students/bulk-delete/', BulkDeleteStudentView.as_view(), name='bulk-delete_student'),
+    path('students/export/', StudentExportView.as_view(), name='export_students'),
+    path('students/import/', StudentImportView.as_view(), name='import_students'),
 
     # TEACHERS
     path('teachers/list/', TeacherListView.as_view(), name='teacher_list'),
@@ -32,6 +41,8 @@ urlpatterns = [
     path('teachers/update/', UpdateTeacherView.as_view(), name='update_teacher'),
     path('teachers/delete/', DeleteTeacherView.as_view(), name='delete_teacher'),
     path('teachers/bulk-delete/', BulkDeleteTeacherView.as_view(), name='bulk_delete_teacher'),
+    path('teachers/export/', TeacherExportView.as_view(), name='export_teachers'),
+    path('teachers/import/', TeacherImportView.as_view(), name='import_teachers'),
 
 
     #DEVICE
@@ -40,6 +51,7 @@ urlpatterns = [
     path('devices/update', UpdateDeviceView.as_view()),
     path('devices/delete/', DeleteDeviceView.as_view()),
     path('devices/bulk-delete/', BulkDeleteDeviceView.as_view()),
+    path('devices/heartbeat/', DeviceHeartbeatView.as_view(), name='device_heartbeat'),
 
 
     #PROGRAM
@@ -64,7 +76,28 @@ urlpatterns = [
     path('timetable/delete/', DeleteTimetableEntryView.as_view(), name='timetable_delete'),
     path('timetable/bulk-delete/', BulkDeleteTimetableEntryView.as_view(), name='timetable-bulk-delete'),
     path('timetable/bulk-create/', BulkCreateTimetableEntryView.as_view(), name='timetable-bulk-create'),
+    path('timetable/export/', TimetableExportView.as_view(), name='timetable_export'),
+    path('timetable/validate/', ValidateTimetableView.as_view(), name='timetable_validate'),
 
     #STATS
-    path('stats/', StatsView.as_view())
+    path('stats/', StatsView.as_view()),
+
+    #SCANS
+    path('scans/ingest/', ScanIngestView.as_view(), name='scan_ingest'),
+    path('scans/ingest-async/', AsyncScanIngestView.as_view(), name='scan_ingest_async'),
+    path('scans/replay/', ScanReplayView.as_view(), name='scan_replay'),
+    path('scans/dedup-stats/', ScanDedupStatsView.as_view(), name='scan_dedup_stats'),
+
+    #ATTENDANCE
+    path('attendance/list/', AttendanceListView.as_view(), name='attendance_list'),
+    path('attendance/partitions/', ScanPartitionsView.as_view(), name='attendance_partitions'),
+    path('attendance/export/', AttendanceExportView.as_view(), name='attendance_export'),
+
+    #LIVE
+    path('live/events/', LiveEventsView.as_view(), name='live_events'),
+    path('live/stats/', LiveStatsView.as_view(), name='live_stats'),
+
+    #REPORTS
+    path('reports/program/', ProgramReportView.as_view(), name='program_report'),
+    path('reports/student/', StudentReportView.as_view(), name='student_report'),
 ]
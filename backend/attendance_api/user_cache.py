@@ -0,0 +1,48 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+
+from .models import User
+
+# Short on purpose: role/is_active changes made by another worker (or by a
+# QuerySet.update() that skips signals) take at most this long to apply.
+USER_CACHE_TTL = getattr(settings, 'USER_CACHE_TTL', 30)
+
+
+class UserCache:
+    """Process-local user id -> active User map with a short TTL.
+
+    Entries are dropped by the User save/delete signals, so changes to
+    ``role``, ``is_active`` or ``permissions`` are seen on the next request.
+    Callers get a copy, never the shared instance.
+    """
+
+    def __init__(self, ttl=USER_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._users = {}
+
+    def get(self, user_id):
+        """Return the active user with ``user_id`` or None."""
+        user_id = str(user_id)
+        with self._lock:
+            cached = self._users.get(user_id)
+        if cached is not None and time.monotonic() - cached[1] <= self.ttl:
+            user = cached[0]
+        else:
+            user = User.objects.filter(id=user_id, is_active=True).first()
+            with self._lock:
+                self._users[user_id] = (user, time.monotonic())
+        return copy.copy(user)
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._users = {}
+            else:
+                self._users.pop(str(user_id), None)
+
+
+user_cache = UserCache()
@@ -0,0 +1,72 @@
+# attendance_api/views/async_scan_views.py
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from ..async_ingest import scan_writer
+from ..ingest import ingest_scan_events, MAX_EVENTS_PER_REQUEST
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncScanIngestView(View):
+    """Same payload as scans/ingest/, but acknowledged before it is written.
+
+    Under ASGI the events are queued for the background batch writer and the
+    reader gets 202 at once; per-event validation errors then only show up in
+    the writer counters (GET this endpoint). Under WSGI there is no long-lived
+    event loop, so the batch is written inline like scans/ingest/.
+    """
+
+    async def post(self, request):
+        try:
+            events = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid JSON body.'
+            }, status=400)
+
+        if isinstance(events, dict):
+            events = events.get('events')
+
+        if not isinstance(events, list):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Expected a list of scan events.'
+            }, status=400)
+
+        if len(events) > MAX_EVENTS_PER_REQUEST:
+            return JsonResponse({
+                'status': 'error',
+                'message': f'A batch may contain at most {MAX_EVENTS_PER_REQUEST} events.'
+            }, status=413)
+
+        if not isinstance(request, ASGIRequest):
+            result = await sync_to_async(ingest_scan_events)(events)
+            return JsonResponse({
+                'status': 'success',
+                'data': result.to_dict()
+            })
+
+        if not scan_writer.submit(events):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Ingest buffer is full, retry shortly.'
+            }, status=503, headers={'Retry-After': '1'})
+
+        return JsonResponse({
+            'status': 'success',
+            'data': {'queued': len(events)}
+        }, status=202)
+
+    async def get(self, request):
+        return JsonResponse({
+            'status': 'success',
+            'data': scan_writer.stats()
+        })
@@ -0,0 +1,91 @@
+# attendance_api/views/attendance_views.py
+
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework import status
+
+from .base_views import CsrfExemptAPIView
+from ..models import ScanEvent
+from ..serializers import ScanEventSerializer
+from ..fast_serializers import FastScanEventSerializer
+from ..ingest import parse_timestamp
+from ..pagination import ListParamError, list_response
+from ..partitions import partition_summary, prune_periods
+
+SCAN_STATUSES = set(ScanEvent.ScanStatus.values)
+
+
+def filter_scan_events(queryset, params):
+    """Apply ?start=&end= (ISO-8601), ?status= and ?device=/?student=/?teacher= filters.
+
+    Time bounds also restrict the monthly ``period`` partitions scanned.
+
+    ``status`` may be a comma-separated list and is matched against the
+    indexed column set at ingest. Raises ListParamError on bad input.
+    """
+    bounds = {}
+    for name, lookup in (('start', 'timestamp__gte'), ('end', 'timestamp__lt')):
+        if params.get(name):
+            moment = parse_timestamp(params[name])
+            if moment is None:
+                raise ListParamError(f'Invalid {name} timestamp')
+            queryset = queryset.filter(**{lookup: moment})
+            bounds[name] = moment
+    queryset = prune_periods(queryset, **bounds)
+
+    if params.get('status'):
+        statuses = {value.strip() for value in params['status'].split(',')}
+        unknown = statuses - SCAN_STATUSES
+        if unknown:
+            raise ListParamError(f"Unknown status(es): {', '.join(sorted(unknown))}")
+        queryset = queryset.filter(status__in=statuses)
+
+    for name in ('device', 'student', 'teacher'):
+        if params.get(name):
+            if not params[name].isdigit():
+                raise ListParamError(f'{name} must be an integer ID')
+            queryset = queryset.filter(**{f'{name}_id': params[name]})
+
+    return queryset
+
+
+class AttendanceListView(CsrfExemptAPIView):
+    """Scan events with their present/late/out_of_session status; today's scans unless ?start=/?end= is given."""
+
+    def get(self, request):
+        params = request.query_params
+        queryset = ScanEvent.objects.all()
+        if not params.get('start') and not params.get('end'):
+            # A range (not __date) so the (status|device, timestamp) indexes apply
+            today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+            queryset = prune_periods(
+                queryset.filter(timestamp__gte=today, timestamp__lt=today + timedelta(days=1)),
+                start=today,
+            )
+
+        try:
+            queryset = filter_scan_events(queryset, params)
+        except ListParamError as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return list_response(
+            request,
+            queryset.order_by('id'),
+            ScanEventSerializer,
+            fast_serializer=FastScanEventSerializer,
+        )
+
+
+class ScanPartitionsView(CsrfExemptAPIView):
+    """Live monthly scan partitions and the ones already archived (see archive_scans)."""
+
+    def get(self, request):
+        return Response({
+            'status': 'success',
+            'data': partition_summary()
+        })
@@ -12,6 +12,8 @@ from django.middleware.csrf import get_token
 # Use relative imports - this is the correct way
 from ..models import User
 from ..serializers import UserSerializer
+from ..middleware import get_app_user
+from ..login_throttle import LoginThrottle, LOGIN_THROTTLE_WINDOW
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -30,19 +32,29 @@ class LoginView(APIView):
                 'message': 'Email and password are required'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        throttle = LoginThrottle(request, email)
+        if throttle.blocked():
+            return Response({
+                'status': 'error',
+                'message': 'Too many login attempts. Try again later.'
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(LOGIN_THROTTLE_WINDOW)})
+
         try:
             user = User.objects.get(email=email, is_active=True)
         except User.DoesNotExist:
+            throttle.failed()
             return Response({
                 'status': 'error',
                 'message': 'Invalid email or password'
             }, status=status.HTTP_401_UNAUTHORIZED)
 
         if not user.check_password(password):
+            throttle.failed()
             return Response({
                 'status': 'error',
                 'message': 'Invalid email or password'
             }, status=status.HTTP_401_UNAUTHORIZED)
+        throttle.succeeded()
 
         # Update last login
         user.last_login = timezone.now()
@@ -86,19 +98,19 @@ class GetCurrentUserView(APIView):
                 'message': 'Session invalid'
             }, status=status.HTTP_401_UNAUTHORIZED)
 
-        try:
-            user = User.objects.get(id=user_id, is_active=True)
-            return Response({
-                'status': 'success',
-                'data': UserSerializer(user).data
-            })
-        except User.DoesNotExist:
+        user = get_app_user(request)
+        if user is None:
             request.session.flush()
             return Response({
                 'status': 'error',
                 'message': 'User not found'
             }, status=status.HTTP_404_NOT_FOUND)
 
+        return Response({
+            'status': 'success',
+            'data': UserSerializer(user).data
+        })
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 class LogoutView(APIView):
@@ -0,0 +1,167 @@
+# attendance_api/views/export_views.py
+
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework import status
+
+from .base_views import CsrfExemptAPIView
+from ..models import Student, Teacher, TimetableEntry, ScanEvent
+from ..fast_serializers import FastStudentSerializer, FastTeacherSerializer, FastTimetableEntrySerializer, \
+    FastScanEventSerializer
+from ..pagination import ListParamError
+from ..old_views import filter_timetable_entries
+from .attendance_views import filter_scan_events
+
+EXPORT_CHUNK_SIZE = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+class _Echo:
+    """File-like object for csv.writer that hands each formatted line back."""
+
+    def write(self, value):
+        return value
+
+
+def _chunks(rows, size):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _csv_value(value):
+    # Same spelling as the JSON API for values csv would write as True/False
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+def stream_export(fast, queryset, output):
+    """Yield the export body chunk by chunk; memory use is bounded by EXPORT_CHUNK_SIZE.
+
+    Values are formatted by the list endpoints' fast serializer, so each row
+    carries exactly what the JSON API returns for it (hasRfid/hasFingerprint
+    included, which the API sends as 1/0).
+    """
+    rows = fast.rows(queryset).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    if output == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fast.names)
+        for chunk in _chunks(rows, EXPORT_CHUNK_SIZE):
+            yield ''.join(
+                writer.writerow([_csv_value(item.get(name)) for name in fast.names])
+                for item in fast.to_data(chunk)
+            )
+    else:
+        for chunk in _chunks(rows, EXPORT_CHUNK_SIZE):
+            yield ''.join(
+                json.dumps(item, separators=(',', ':')) + '\n'
+                for item in fast.to_data(chunk)
+            )
+
+
+async def _async_chunks(chunks):
+    """Serve a sync export generator under ASGI without buffering it.
+
+    Given a sync iterator, Django's ASGI handler drains it into a list before
+    sending anything. Here each chunk is produced in the request's
+    thread-sensitive executor (where the view itself ran, so the database
+    cursor stays on its connection) and sent as soon as it is ready.
+    """
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await next_chunk(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+class ExportBaseView(CsrfExemptAPIView):
+    """Streams a table as CSV (default) or NDJSON; pick with ?output=csv|ndjson.
+
+    The body is a plain generator under WSGI and an async iterator under
+    ASGI, so memory stays bounded by EXPORT_CHUNK_SIZE on either server.
+    """
+    fast_serializer = None
+    export_name = 'export'
+
+    def get_queryset(self, request):
+        raise NotImplementedError
+
+    def get(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response({
+                'status': 'error',
+                'message': f"output must be one of: {', '.join(EXPORT_FORMATS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset(request)
+        if isinstance(queryset, Response):
+            return queryset
+
+        content_type, extension = EXPORT_FORMATS[output]
+        body = stream_export(self.fast_serializer(), queryset.order_by('id'), output)
+        if isinstance(request._request, ASGIRequest):
+            body = _async_chunks(body)
+        response = StreamingHttpResponse(body, content_type=content_type)
+        stamp = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+        response['Content-Disposition'] = f'attachment; filename="{self.export_name}-{stamp}.{extension}"'
+        return response
+
+
+class StudentExportView(ExportBaseView):
+    fast_serializer = FastStudentSerializer
+    export_name = 'students'
+
+    def get_queryset(self, request):
+        return Student.objects.all()
+
+
+class TeacherExportView(ExportBaseView):
+    fast_serializer = FastTeacherSerializer
+    export_name = 'teachers'
+
+    def get_queryset(self, request):
+        return Teacher.objects.all()
+
+
+class TimetableExportView(ExportBaseView):
+    fast_serializer = FastTimetableEntrySerializer
+    export_name = 'timetable'
+
+    def get_queryset(self, request):
+        return filter_timetable_entries(TimetableEntry.objects.all(), request.query_params)
+
+
+class AttendanceExportView(ExportBaseView):
+    """Raw scan events; takes the same filters as the attendance list (see filter_scan_events)."""
+    fast_serializer = FastScanEventSerializer
+    export_name = 'attendance'
+
+    def get_queryset(self, request):
+        try:
+            return filter_scan_events(ScanEvent.objects.all(), request.query_params)
+        except ListParamError as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
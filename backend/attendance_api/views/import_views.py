@@ -0,0 +1,49 @@
+# attendance_api/views/import_views.py
+
+import io
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from .base_views import CsrfExemptAPIView
+from ..roster_import import import_roster, RosterImportError
+
+
+class RosterImportBaseView(CsrfExemptAPIView):
+    """Upload a CSV roster as multipart ``file``; rows are upserted in chunks."""
+    roster = None
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({
+                'status': 'error',
+                'message': 'A CSV file is required (multipart field "file")'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            report = import_roster(self.roster, text)
+        except RosterImportError as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except UnicodeDecodeError:
+            return Response({
+                'status': 'error',
+                'message': 'File must be UTF-8 encoded CSV'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'status': 'success',
+            'data': report.to_dict()
+        })
+
+
+class StudentImportView(RosterImportBaseView):
+    roster = 'students'
+
+
+class TeacherImportView(RosterImportBaseView):
+    roster = 'teachers'
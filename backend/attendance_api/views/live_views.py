@@ -0,0 +1,90 @@
+# attendance_api/views/live_views.py
+
+import asyncio
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from ..live_events import broadcaster, Subscription
+
+LIVE_KEEPALIVE_INTERVAL = getattr(settings, 'LIVE_KEEPALIVE_INTERVAL', 15)
+
+EVENT_TYPES = {'scan', 'device'}
+
+
+def _id_set(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    values = {value.strip() for value in raw.split(',')}
+    if not all(value.isdigit() for value in values):
+        raise ValueError(f'{name} must be a comma-separated list of integer IDs')
+    return {int(value) for value in values}
+
+
+async def _stream(subscription):
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), LIVE_KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle connection
+                yield ': keepalive\n\n'
+                continue
+            yield message
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+class LiveEventsView(View):
+    """Server-sent events stream of new scans and device online/offline changes.
+
+    Filters (comma-separated IDs): ?program=, ?course=, ?device=; ?types=scan,device.
+    Scan events only carry program/course when they fall inside a timetable
+    session, so program/course filters only pass in-session scans. Needs ASGI.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'The live stream needs the ASGI server.'
+            }, status=501)
+
+        params = request.GET
+        try:
+            types = set(params['types'].split(',')) if params.get('types') else None
+            if types is not None and not types <= EVENT_TYPES:
+                raise ValueError(f"types must be a subset of: {', '.join(sorted(EVENT_TYPES))}")
+            subscription = Subscription(
+                asyncio.get_running_loop(),
+                types=types,
+                programs=_id_set(params, 'program'),
+                courses=_id_set(params, 'course'),
+                devices=_id_set(params, 'device'),
+            )
+        except ValueError as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
+        broadcaster.subscribe(subscription)
+        response = StreamingHttpResponse(_stream(subscription), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class LiveStatsView(View):
+    async def get(self, request):
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'subscribers': broadcaster.subscriber_count,
+                'published': broadcaster.published,
+            }
+        })
@@ -0,0 +1,16 @@
+# attendance_api/views/metrics_views.py
+
+from django.http import HttpResponse
+
+from .base_views import CsrfExemptAPIView
+from ..metrics import request_metrics
+
+
+class MetricsView(CsrfExemptAPIView):
+    """Prometheus scrape target: per-route request metrics of this worker process."""
+
+    def get(self, request):
+        return HttpResponse(
+            request_metrics.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
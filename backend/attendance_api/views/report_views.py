@@ -0,0 +1,81 @@
+# attendance_api/views/report_views.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.response import Response
+from rest_framework import status
+
+from .base_views import CsrfExemptAPIView
+from ..models import Program, Student
+from ..reports import program_report, student_report
+
+REPORT_DEFAULT_DAYS = getattr(settings, 'REPORT_DEFAULT_DAYS', 180)
+
+
+def _error(message, code=status.HTTP_400_BAD_REQUEST):
+    return Response({'status': 'error', 'message': message}, status=code)
+
+
+class ReportBaseView(CsrfExemptAPIView):
+    """?start=&end= are inclusive YYYY-MM-DD dates; the default is the last REPORT_DEFAULT_DAYS days."""
+
+    def date_range(self, params):
+        end = parse_date(params['end']) if params.get('end') else timezone.localdate()
+        start = parse_date(params['start']) if params.get('start') else None
+        if end is None or (params.get('start') and start is None):
+            return None
+        return start or end - timedelta(days=REPORT_DEFAULT_DAYS), end
+
+    def get_object(self, model, params, name):
+        value = params.get(name, '')
+        if not value.isdigit():
+            return _error(f'{name} must be an integer ID')
+        try:
+            return model.objects.get(id=value)
+        except model.DoesNotExist:
+            return _error(f'{model.__name__} not found', status.HTTP_404_NOT_FOUND)
+
+
+class ProgramReportView(ReportBaseView):
+    """Per-course attendance for a program: ?program=<id>[&year=][&start=&end=]."""
+
+    def get(self, request):
+        params = request.query_params
+        program = self.get_object(Program, params, 'program')
+        if isinstance(program, Response):
+            return program
+
+        dates = self.date_range(params)
+        if dates is None:
+            return _error('start and end must be YYYY-MM-DD dates')
+
+        year = params.get('year')
+        if year is not None and not year.isdigit():
+            return _error('year must be an integer')
+
+        return Response({
+            'status': 'success',
+            'data': program_report(program, *dates, year=int(year) if year else None)
+        })
+
+
+class StudentReportView(ReportBaseView):
+    """Per-course attendance for one student: ?student=<id>[&start=&end=]."""
+
+    def get(self, request):
+        params = request.query_params
+        student = self.get_object(Student, params, 'student')
+        if isinstance(student, Response):
+            return student
+
+        dates = self.date_range(params)
+        if dates is None:
+            return _error('start and end must be YYYY-MM-DD dates')
+
+        return Response({
+            'status': 'success',
+            'data': student_report(student, *dates)
+        })
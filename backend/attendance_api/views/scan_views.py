@@ -0,0 +1,120 @@
+# attendance_api/views/scan_views.py
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from .base_views import CsrfExemptAPIView
+from ..ingest import ingest_scan_events, MAX_EVENTS_PER_REQUEST, REPLAY_MAX_EVENTS, REPLAY_CHUNK_SIZE
+from ..device_heartbeat import heartbeat_tracker
+from ..scan_dedup import swipe_deduper
+
+
+class ScanIngestView(CsrfExemptAPIView):
+    """Batch endpoint for readers: accepts a list of {device_id, tag_uid, timestamp}."""
+
+    def post(self, request):
+        events = request.data
+        if isinstance(events, dict):
+            events = events.get('events')
+
+        if not isinstance(events, list):
+            return Response({
+                'status': 'error',
+                'message': 'Expected a list of scan events.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(events) > MAX_EVENTS_PER_REQUEST:
+            return Response({
+                'status': 'error',
+                'message': f'A batch may contain at most {MAX_EVENTS_PER_REQUEST} events.'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        result = ingest_scan_events(events)
+
+        return Response({
+            'status': 'success',
+            'data': result.to_dict()
+        }, status=status.HTTP_200_OK)
+
+
+class ScanReplayView(CsrfExemptAPIView):
+    """Backlog upload from a reader that was offline.
+
+    Body: {device_id, events: [{tag_uid, timestamp, sequence}, ...]}; every
+    event needs the reader's per-device ``sequence``. Events may be out of
+    order, and resending the same backlog stores nothing twice.
+    """
+
+    def post(self, request):
+        events = request.data.get('events') if isinstance(request.data, dict) else None
+        if not isinstance(events, list):
+            return Response({
+                'status': 'error',
+                'message': 'Expected {"device_id": ..., "events": [...]}.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(events) > REPLAY_MAX_EVENTS:
+            return Response({
+                'status': 'error',
+                'message': f'A replay may contain at most {REPLAY_MAX_EVENTS} events.'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        device_id = request.data.get('device_id')
+        if device_id is not None:
+            events = [
+                dict(event, device_id=event.get('device_id', device_id)) if isinstance(event, dict) else event
+                for event in events
+            ]
+
+        result = ingest_scan_events(events, require_sequence=True, chunk_size=REPLAY_CHUNK_SIZE)
+
+        return Response({
+            'status': 'success',
+            'data': result.to_dict()
+        }, status=status.HTTP_200_OK)
+
+
+class DeviceHeartbeatView(CsrfExemptAPIView):
+    """Liveness ping from a reader: {device_id} or {device_ids: [...]}.
+
+    Only touches memory; lastSeen/status reach the database on the next batched flush.
+    """
+
+    def post(self, request):
+        device_ids = request.data.get('device_ids')
+        if device_ids is None and request.data.get('device_id') is not None:
+            device_ids = [request.data.get('device_id')]
+
+        if not isinstance(device_ids, list) or not device_ids:
+            return Response({
+                'status': 'error',
+                'message': 'device_id or a list of device_ids is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            device_ids = [int(device_id) for device_id in device_ids]
+        except (TypeError, ValueError):
+            return Response({
+                'status': 'error',
+                'message': 'Device IDs must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        unknown = heartbeat_tracker.beat(device_ids)
+
+        return Response({
+            'status': 'success',
+            'data': {
+                'accepted': len(device_ids) - len(unknown),
+                'unknown': unknown,
+            }
+        })
+
+
+class ScanDedupStatsView(CsrfExemptAPIView):
+    """Counters of the in-process swipe deduper (since this worker started)."""
+
+    def get(self, request):
+        return Response({
+            'status': 'success',
+            'data': swipe_deduper.stats()
+        })
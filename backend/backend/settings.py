@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,7 +50,23 @@ REST_FRAMEWORK = {
     ],
 }
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Database-backed sessions
+# Sessions
+# SESSION_STORE picks the backend: 'db', 'cached_db' (reads come from the
+# cache, writes go through to the database) or 'cache' (no database at all;
+# sessions are lost with the cache). The cache-backed stores need a cache
+# shared by every worker (CACHE_BACKEND=redis, or 'file' on one host),
+# otherwise a logout only takes effect on one worker; the system check
+# attendance_api.E001 refuses them with locmem. The default is therefore
+# 'cached_db' when CACHE_BACKEND names a shared cache and 'db' otherwise.
+# Every variant skips the per-request expiry rewrite unless the session
+# changed or SESSION_SAVE_INTERVAL seconds have passed, but with 'db' that
+# only saves the write: each request still reads its session row.
+
+SESSION_STORE = os.environ.get(
+    'SESSION_STORE', 'db' if os.environ.get('CACHE_BACKEND', 'locmem') == 'locmem' else 'cached_db'
+)
+SESSION_ENGINE = f'attendance_api.sessions.{SESSION_STORE}'
+SESSION_SAVE_INTERVAL = int(os.environ.get('SESSION_SAVE_INTERVAL', 60))  # seconds
 SESSION_COOKIE_AGE = 86400  # 24 hours in seconds
 SESSION_COOKIE_SECURE = False  # Set to True if using HTTPS
 SESSION_COOKIE_HTTPONLY = True
@@ -63,9 +80,11 @@ CSRF_COOKIE_SAMESITE = 'Lax'
 CSRF_USE_SESSIONS = True
 
 MIDDLEWARE = [
+    'attendance_api.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'attendance_api.middleware.AppUserMiddleware',
     'django.middleware.common.CommonMiddleware',
     #'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -118,10 +137,186 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
+# DB_ENGINE picks 'sqlite' (default, single node) or 'postgresql'.
+#
+# SQLite: DB_SQLITE_PROFILE picks the connection settings.
+#   'immediate' (default) starts write transactions with BEGIN IMMEDIATE so
+#     concurrent writers queue on the 20 s busy timeout instead of failing
+#     with "database is locked". Per connection only; the file is untouched.
+#   'wal' adds write-ahead logging (readers never block the writer),
+#     synchronous=NORMAL (safe with WAL) and a memory-mapped read path. WAL is
+#     stored in the database file itself, so the first connection converts
+#     it for good: enable it on a deployment's own database, not the dev DB
+#     checked into the repository.
+#   'stock' is plain SQLite, for comparison.
+#
+# PostgreSQL: connections are kept for DB_CONN_MAX_AGE seconds, or with
+# DB_POOL=1 taken from a psycopg pool (needs psycopg[pool]).
+# Compare the modes with `manage.py bench_db_concurrency`.
+
+SQLITE_PROFILES = {
+    'stock': {},
+    'immediate': {
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': 20,  # busy timeout, seconds
+    },
+    'wal': {
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA mmap_size=268435456;'
+            'PRAGMA temp_store=MEMORY'
+        ),
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': 20,  # busy timeout, seconds
+    },
+}
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DB_POOL = os.environ.get('DB_POOL') == '1'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'attendance'),
+            'USER': os.environ.get('DB_USER', 'attendance'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # The pool owns connection lifetime, so persistent connections are off with it
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 20)),
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': SQLITE_PROFILES[os.environ.get('DB_SQLITE_PROFILE', 'immediate')],
+        }
+    }
+
+
+# List endpoints
+# Keyset pagination is opt-in (?limit= / ?cursor=) so clients that expect the
+# full list keep working; ?fields= narrows both the payload and the SELECT.
+
+LIST_PAGE_SIZE = 100
+LIST_MAX_PAGE_SIZE = 1000
+
+
+# Device liveness
+# Heartbeats are kept in memory and written back in one UPDATE per interval;
+# a device is reported offline once it has been silent for DEVICE_OFFLINE_AFTER.
+
+DEVICE_HEARTBEAT_FLUSH_INTERVAL = 10  # seconds
+DEVICE_OFFLINE_AFTER = 90  # seconds
+
+
+# Timetable clashes
+# Create, update, bulk create and timetable/validate/ reject entries that
+# double-book a teacher, device or location. Set this to also treat a
+# program's year group as a resource. Leave it off if one cohort runs parallel
+# sessions (electives, lab groups), which it would reject.
+
+TIMETABLE_PROGRAM_YEAR_CLASHES = False
+
+
+# Dashboard counters are recounted (one query) after model signals report a
+# change, on every worker via the shared cache; this is the safety-net full
+# recount interval for writes that bypass the signals.
+
+STATS_RECOMPUTE_INTERVAL = 300  # seconds
+
+
+# Scan ingest
+# Repeat reads of the same tag on the same device within SCAN_DEDUP_WINDOW
+# seconds are dropped in memory; at most SCAN_DEDUP_MAX_KEYS (device, tag)
+# pairs are tracked per worker (least recently read evicted first).
+
+SCAN_DEDUP_WINDOW = 2.0  # seconds
+SCAN_DEDUP_MAX_KEYS = 100000
+
+# scans/replay/ takes offline backlogs keyed on (device, sequence) and commits
+# them chunk by chunk.
+SCAN_REPLAY_MAX_EVENTS = 100000
+SCAN_REPLAY_CHUNK_SIZE = 5000
+
+# scans/ingest-async/ (ASGI only) acks immediately and a background task
+# writes the queued events in batches of up to ASYNC_INGEST_BATCH_SIZE, at
+# least every ASYNC_INGEST_FLUSH_INTERVAL seconds. Beyond
+# ASYNC_INGEST_MAX_PENDING queued events the endpoint answers 503.
+ASYNC_INGEST_BATCH_SIZE = 2000
+ASYNC_INGEST_FLUSH_INTERVAL = 0.5  # seconds
+ASYNC_INGEST_MAX_PENDING = 100000
+
+# live/events/ (ASGI only) streams new scans and device status changes as
+# server-sent events. A subscriber more than LIVE_SUBSCRIBER_QUEUE_SIZE events
+# behind starts losing events instead of growing its buffer.
+LIVE_SUBSCRIBER_QUEUE_SIZE = 1000
+LIVE_KEEPALIVE_INTERVAL = 15  # seconds
+
+# A 100k-event replay is roughly 8 MB of JSON; Django's default cap is 2.5 MB.
+DATA_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024
+
+# Scans are partitioned by local month (YYYYMM). `manage.py archive_scans`
+# writes months older than SCAN_ARCHIVE_RETAIN_MONTHS to gzipped NDJSON in
+# SCAN_ARCHIVE_DIR and deletes them from the table. Rollups are kept, so the
+# report endpoints still cover archived months.
+SCAN_ARCHIVE_RETAIN_MONTHS = 6
+SCAN_ARCHIVE_DIR = os.environ.get('SCAN_ARCHIVE_DIR', BASE_DIR / 'archive')
+
+
+# Attendance
+# Each scan is classified at ingest: present, late (more than
+# ATTENDANCE_GRACE_MINUTES after the session start) or out_of_session. The
+# rollups behind the report endpoints take a person's status from their first scan.
+
+ATTENDANCE_GRACE_MINUTES = 10
+REPORT_DEFAULT_DAYS = 180
+
+
+# The signed-in user is cached per process and dropped on User save/delete;
+# the TTL bounds staleness for changes made by other workers.
+
+USER_CACHE_TTL = 30  # seconds
+
+
+# Request metrics
+# Every request's latency, query count, DB time and response size is recorded
+# per route and served in the Prometheus text format at /metrics (per worker
+# process). Requests running more than METRICS_QUERY_BUDGET queries are
+# logged as warnings by attendance_api.middleware.
+
+METRICS_QUERY_BUDGET = 50
+
+
+# Cache
+# CACHE_BACKEND is 'locmem' (default, per process), 'file' (shared between
+# workers on one host) or 'redis' (CACHE_LOCATION is the redis:// URL).
+# The credential and timetable indexes and the dashboard counters announce
+# changes to other workers through it, so run more than one worker only with
+# 'file' or 'redis'.
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'attendance-api'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/0'),
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
     }
 }
 
@@ -145,6 +340,52 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PASSWORD_HASHER ('pbkdf2', 'scrypt' or 'argon2'; argon2 needs argon2-cffi)
+# hashes new and rehashed passwords; the others stay listed so existing hashes
+# still verify. Users are rehashed with the current policy on their next login.
+# Measure the cost on the target hardware with `manage.py bench_login_hashers`.
+
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'attendance_api.hashers.TunablePBKDF2PasswordHasher',
+    'scrypt': 'attendance_api.hashers.TunableScryptPasswordHasher',
+    'argon2': 'attendance_api.hashers.TunableArgon2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+
+# Costs default to Django's own (e.g. 1,000,000 PBKDF2 iterations on Django
+# 5.2) and are only changed by setting the environment variables below.
+# WARNING: a cost below Django's default weakens every stored password, because
+# each user is rehashed at the lower cost on their next login. `manage.py check`
+# reports it as attendance_api.W001 while it is in effect.
+if 'PASSWORD_PBKDF2_ITERATIONS' in os.environ:
+    PASSWORD_PBKDF2_ITERATIONS = int(os.environ['PASSWORD_PBKDF2_ITERATIONS'])
+if 'PASSWORD_SCRYPT_WORK_FACTOR' in os.environ:
+    PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ['PASSWORD_SCRYPT_WORK_FACTOR'])
+if 'PASSWORD_ARGON2_TIME_COST' in os.environ:
+    PASSWORD_ARGON2_TIME_COST = int(os.environ['PASSWORD_ARGON2_TIME_COST'])
+if 'PASSWORD_ARGON2_MEMORY_COST' in os.environ:
+    PASSWORD_ARGON2_MEMORY_COST = int(os.environ['PASSWORD_ARGON2_MEMORY_COST'])  # KiB
+
+
+# Login throttling
+# Failed logins are counted in the cache (see CACHE_BACKEND; use a shared cache
+# when running several workers), per client IP and per (client IP, email).
+# Successful logins never count. Over a limit, login answers 429 before hashing.
+
+LOGIN_FAILURES_PER_IP = 30  # failed attempts per window
+LOGIN_FAILURES_PER_IP_EMAIL = 5  # failed attempts per window
+LOGIN_THROTTLE_WINDOW = 300  # seconds
+
+# Behind a reverse proxy, set TRUSTED_PROXY_HEADER (e.g. HTTP_X_FORWARDED_FOR)
+# and the number of proxies that append to it; otherwise REMOTE_ADDR is the client.
+TRUSTED_PROXY_HEADER = os.environ.get('TRUSTED_PROXY_HEADER') or None
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 1))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
 
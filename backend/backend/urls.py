@@ -1,7 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from attendance_api.views.metrics_views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('attendance_api/', include('attendance_api.urls')),
+    # No trailing slash: the path Prometheus scrapes by default
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file